@@ -0,0 +1,32 @@
+"""unread partial indexes
+
+Revision ID: 2d6f8a0c4e19
+Revises: 9c3e5b7a1d24
+Create Date: 2026-10-18 14:41:26.115094
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2d6f8a0c4e19'
+down_revision: Union[str, Sequence[str], None] = '9c3e5b7a1d24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_notifications_user_id_unread', 'notifications', ['user_id'], unique=False, postgresql_where=sa.text('is_read = false'))
+    op.create_index('ix_notifications_seller_id_unread', 'notifications', ['seller_id'], unique=False, postgresql_where=sa.text('is_read = false'))
+    op.create_index('ix_messages_conversation_id_unread', 'messages', ['conversation_id', 'id'], unique=False, postgresql_where=sa.text('is_read = false'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_messages_conversation_id_unread', table_name='messages')
+    op.drop_index('ix_notifications_seller_id_unread', table_name='notifications')
+    op.drop_index('ix_notifications_user_id_unread', table_name='notifications')
@@ -0,0 +1,36 @@
+"""product catalog indexes
+
+Revision ID: 3c5e1f7a9b20
+Revises: 6ef2b26f1cfd
+Create Date: 2026-10-18 09:12:31.418204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c5e1f7a9b20'
+down_revision: Union[str, Sequence[str], None] = '6ef2b26f1cfd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_products_created_at_id', 'products', ['created_at', 'id'], unique=False)
+    op.create_index('ix_products_category_created_at_id', 'products', ['category_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_products_seller_created_at_id', 'products', ['seller_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_products_base_price', 'products', ['base_price'], unique=False)
+    op.create_index(op.f('ix_product_variants_product_id'), 'product_variants', ['product_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_product_variants_product_id'), table_name='product_variants')
+    op.drop_index('ix_products_base_price', table_name='products')
+    op.drop_index('ix_products_seller_created_at_id', table_name='products')
+    op.drop_index('ix_products_category_created_at_id', table_name='products')
+    op.drop_index('ix_products_created_at_id', table_name='products')
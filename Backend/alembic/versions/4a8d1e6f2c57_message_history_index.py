@@ -0,0 +1,28 @@
+"""message history index
+
+Revision ID: 4a8d1e6f2c57
+Revises: f3b7c2a91d48
+Create Date: 2026-10-18 13:52:37.640118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4a8d1e6f2c57'
+down_revision: Union[str, Sequence[str], None] = 'f3b7c2a91d48'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_messages_conversation_timestamp_id', 'messages', ['conversation_id', 'timestamp', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_messages_conversation_timestamp_id', table_name='messages')
@@ -0,0 +1,51 @@
+"""notification created_at datetime
+
+Revision ID: 5e0b7d3f9a62
+Revises: 2d6f8a0c4e19
+Create Date: 2026-10-18 15:03:48.372650
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e0b7d3f9a62'
+down_revision: Union[str, Sequence[str], None] = '2d6f8a0c4e19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing values are isoformat strings; rows missing one fall back to the migration time.
+    op.execute("UPDATE notifications SET created_at = to_char(now() AT TIME ZONE 'utc', 'YYYY-MM-DD\"T\"HH24:MI:SS.US') WHERE created_at IS NULL OR created_at = ''")
+    op.execute("UPDATE notifications SET is_read = false WHERE is_read IS NULL")
+    op.alter_column('notifications', 'created_at',
+               existing_type=sa.String(),
+               type_=sa.DateTime(),
+               nullable=False,
+               postgresql_using='created_at::timestamp')
+    op.alter_column('notifications', 'is_read',
+               existing_type=sa.Boolean(),
+               nullable=False,
+               server_default=sa.false())
+    op.create_index('ix_notifications_user_feed', 'notifications', ['user_id', 'is_read', sa.text('created_at DESC'), sa.text('id DESC')], unique=False)
+    op.create_index('ix_notifications_seller_feed', 'notifications', ['seller_id', 'is_read', sa.text('created_at DESC'), sa.text('id DESC')], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_notifications_seller_feed', table_name='notifications')
+    op.drop_index('ix_notifications_user_feed', table_name='notifications')
+    op.alter_column('notifications', 'is_read',
+               existing_type=sa.Boolean(),
+               nullable=True,
+               server_default=None)
+    op.alter_column('notifications', 'created_at',
+               existing_type=sa.DateTime(),
+               type_=sa.String(),
+               nullable=True,
+               postgresql_using="to_char(created_at, 'YYYY-MM-DD\"T\"HH24:MI:SS.US')")
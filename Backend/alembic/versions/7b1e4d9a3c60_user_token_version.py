@@ -0,0 +1,28 @@
+"""user token version
+
+Revision ID: 7b1e4d9a3c60
+Revises: 5e0b7d3f9a62
+Create Date: 2026-10-18 17:21:09.514203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b1e4d9a3c60'
+down_revision: Union[str, Sequence[str], None] = '5e0b7d3f9a62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('token_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'token_version')
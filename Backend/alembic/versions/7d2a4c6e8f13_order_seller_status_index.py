@@ -0,0 +1,30 @@
+"""order seller status index
+
+Revision ID: 7d2a4c6e8f13
+Revises: 3c5e1f7a9b20
+Create Date: 2026-10-18 10:03:47.216590
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2a4c6e8f13'
+down_revision: Union[str, Sequence[str], None] = '3c5e1f7a9b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_orders_seller_id_status', 'orders', ['seller_id', 'status'], unique=False)
+    op.create_index('ix_orders_seller_id_created_at', 'orders', ['seller_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_orders_seller_id_created_at', table_name='orders')
+    op.drop_index('ix_orders_seller_id_status', table_name='orders')
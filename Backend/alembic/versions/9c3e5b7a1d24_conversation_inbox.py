@@ -0,0 +1,61 @@
+"""conversation inbox
+
+Revision ID: 9c3e5b7a1d24
+Revises: 4a8d1e6f2c57
+Create Date: 2026-10-18 14:16:52.803561
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c3e5b7a1d24'
+down_revision: Union[str, Sequence[str], None] = '4a8d1e6f2c57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('conversations', sa.Column('last_message_id', sa.Integer(), nullable=True))
+    op.add_column('conversations', sa.Column('last_message_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False))
+    op.add_column('conversations', sa.Column('sender_unread_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('conversations', sa.Column('receiver_unread_count', sa.Integer(), server_default='0', nullable=False))
+
+    # Backfill from existing messages: latest message, and unread messages written by the other side.
+    op.execute("""
+        UPDATE conversations c
+        SET last_message_id = m.last_message_id,
+            last_message_at = COALESCE(m.last_message_at, c.started_at, now()),
+            sender_unread_count = COALESCE(m.sender_unread_count, 0),
+            receiver_unread_count = COALESCE(m.receiver_unread_count, 0)
+        FROM conversations c2
+        LEFT JOIN (
+            SELECT
+                messages.conversation_id,
+                MAX(messages.id) AS last_message_id,
+                MAX(messages.timestamp) AS last_message_at,
+                COUNT(*) FILTER (WHERE NOT messages.is_read AND messages.sender_id <> conversations.sender_id) AS sender_unread_count,
+                COUNT(*) FILTER (WHERE NOT messages.is_read AND messages.sender_id = conversations.sender_id) AS receiver_unread_count
+            FROM messages
+            JOIN conversations ON conversations.id = messages.conversation_id
+            GROUP BY messages.conversation_id
+        ) m ON m.conversation_id = c2.id
+        WHERE c.id = c2.id
+    """)
+
+    op.create_index('ix_conversations_sender_last_message_at', 'conversations', ['sender_id', 'last_message_at'], unique=False)
+    op.create_index('ix_conversations_receiver_last_message_at', 'conversations', ['receiver_id', 'last_message_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_conversations_receiver_last_message_at', table_name='conversations')
+    op.drop_index('ix_conversations_sender_last_message_at', table_name='conversations')
+    op.drop_column('conversations', 'receiver_unread_count')
+    op.drop_column('conversations', 'sender_unread_count')
+    op.drop_column('conversations', 'last_message_at')
+    op.drop_column('conversations', 'last_message_id')
@@ -0,0 +1,81 @@
+"""seller stats
+
+Revision ID: b81f0d3e5a47
+Revises: 7d2a4c6e8f13
+Create Date: 2026-10-18 11:21:05.904377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b81f0d3e5a47'
+down_revision: Union[str, Sequence[str], None] = '7d2a4c6e8f13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('seller_stats',
+    sa.Column('seller_id', sa.Integer(), nullable=False),
+    sa.Column('total_revenue', sa.Float(), nullable=False),
+    sa.Column('total_orders', sa.Integer(), nullable=False),
+    sa.Column('pending_orders', sa.Integer(), nullable=False),
+    sa.Column('confirmed_orders', sa.Integer(), nullable=False),
+    sa.Column('shipped_orders', sa.Integer(), nullable=False),
+    sa.Column('delivered_orders', sa.Integer(), nullable=False),
+    sa.Column('cancelled_orders', sa.Integer(), nullable=False),
+    sa.Column('product_count', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['seller_id'], ['sellers.id'], ),
+    sa.PrimaryKeyConstraint('seller_id')
+    )
+    op.create_index(op.f('ix_seller_stats_total_revenue'), 'seller_stats', ['total_revenue'], unique=False)
+
+    # Backfill from existing orders and products; same aggregation as app.scripts.rebuild_seller_stats.
+    op.execute("""
+        INSERT INTO seller_stats (
+            seller_id, total_revenue, total_orders, pending_orders, confirmed_orders,
+            shipped_orders, delivered_orders, cancelled_orders, product_count, updated_at
+        )
+        SELECT
+            s.id,
+            COALESCE(o.total_revenue, 0),
+            COALESCE(o.total_orders, 0),
+            COALESCE(o.pending_orders, 0),
+            COALESCE(o.confirmed_orders, 0),
+            COALESCE(o.shipped_orders, 0),
+            COALESCE(o.delivered_orders, 0),
+            COALESCE(o.cancelled_orders, 0),
+            COALESCE(p.product_count, 0),
+            now()
+        FROM sellers s
+        LEFT JOIN (
+            SELECT
+                seller_id,
+                SUM(total_amount) FILTER (WHERE status = 'Delivered') AS total_revenue,
+                COUNT(*) AS total_orders,
+                COUNT(*) FILTER (WHERE status = 'Pending') AS pending_orders,
+                COUNT(*) FILTER (WHERE status = 'Confirmed') AS confirmed_orders,
+                COUNT(*) FILTER (WHERE status = 'Shipped') AS shipped_orders,
+                COUNT(*) FILTER (WHERE status = 'Delivered') AS delivered_orders,
+                COUNT(*) FILTER (WHERE status = 'Cancelled') AS cancelled_orders
+            FROM orders
+            GROUP BY seller_id
+        ) o ON o.seller_id = s.id
+        LEFT JOIN (
+            SELECT seller_id, COUNT(*) AS product_count
+            FROM products
+            GROUP BY seller_id
+        ) p ON p.seller_id = s.id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_seller_stats_total_revenue'), table_name='seller_stats')
+    op.drop_table('seller_stats')
@@ -13,6 +13,54 @@ class Settings:
     MAIL_FROM: str = os.getenv("MAIL_FROM")
     MAIL_PORT: int = int(os.getenv("MAIL_PORT"))
     MAIL_SERVER: str = os.getenv("MAIL_SERVER")
+    OTP_TTL_SECONDS: int = int(os.getenv("OTP_TTL_SECONDS", "300"))
+    OTP_MAX_ATTEMPTS: int = int(os.getenv("OTP_MAX_ATTEMPTS", "5"))
+    MAIL_BACKEND: str = os.getenv("MAIL_BACKEND", "smtp")  # "smtp", or "memory" for tests
+    MAIL_STARTTLS: bool = os.getenv("MAIL_STARTTLS", "true").lower() == "true"
+    MAIL_USE_CREDENTIALS: bool = os.getenv("MAIL_USE_CREDENTIALS", "true").lower() == "true"
+    MAIL_WORKERS: int = int(os.getenv("MAIL_WORKERS", "2"))
+    MAIL_QUEUE_SIZE: int = int(os.getenv("MAIL_QUEUE_SIZE", "1000"))
+    MAIL_BATCH_SIZE: int = int(os.getenv("MAIL_BATCH_SIZE", "20"))
+    MAIL_MAX_RETRIES: int = int(os.getenv("MAIL_MAX_RETRIES", "5"))
+    MAIL_RETRY_BASE_SECONDS: float = float(os.getenv("MAIL_RETRY_BASE_SECONDS", "1"))
+    MAIL_SEND_TIMEOUT_SECONDS: float = float(os.getenv("MAIL_SEND_TIMEOUT_SECONDS", "30"))
+    MAIL_IDLE_TIMEOUT_SECONDS: float = float(os.getenv("MAIL_IDLE_TIMEOUT_SECONDS", "60"))
+    REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    REDIS_BACKEND: str = os.getenv("REDIS_BACKEND", "redis")  # "redis", or "fakeredis" for tests
+    REDIS_MAX_CONNECTIONS: int = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+    REDIS_POOL_TIMEOUT: int = int(os.getenv("REDIS_POOL_TIMEOUT", "5"))
+    # Limit checks are synchronous: with Redis storage every limited request does blocking Redis
+    # I/O on the event loop. Offline/test runs (REDIS_BACKEND != "redis") default to memory.
+    RATE_LIMIT_STORAGE_URI: str = os.getenv(
+        "RATE_LIMIT_STORAGE_URI",
+        os.getenv("REDIS_URL", "redis://localhost:6379/0") if os.getenv("REDIS_BACKEND", "redis") == "redis" else "memory://"
+    )
+    RATE_LIMIT_STRATEGY: str = os.getenv("RATE_LIMIT_STRATEGY", "fixed-window")  # or "moving-window" for a sliding log
+    RATE_LIMIT_KEY: str = os.getenv("RATE_LIMIT_KEY", "user")  # "user", or "ip" to key every request by client address
+    PRINCIPAL_CACHE_TTL_SECONDS: int = int(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "30"))
+    PRINCIPAL_CACHE_SIZE: int = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+    PRINCIPAL_CACHE_REDIS: bool = os.getenv("PRINCIPAL_CACHE_REDIS", "true").lower() == "true"
+    PROFILE_CACHE_TTL_SECONDS: int = int(os.getenv("PROFILE_CACHE_TTL_SECONDS", "300"))
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+    PASSWORD_HASH_MAX_QUEUE: int = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64"))
+    WEBSOCKET_BROKER: str = os.getenv("WEBSOCKET_BROKER", "redis")  # "redis", or "memory" for a single process
+    WEBSOCKET_SEND_QUEUE_SIZE: int = int(os.getenv("WEBSOCKET_SEND_QUEUE_SIZE", "64"))
+    WEBSOCKET_SEND_TIMEOUT_SECONDS: float = float(os.getenv("WEBSOCKET_SEND_TIMEOUT_SECONDS", "10"))
+    WEBSOCKET_SLOW_CONSUMER_POLICY: str = os.getenv("WEBSOCKET_SLOW_CONSUMER_POLICY", "drop_oldest")  # or "disconnect"
+    UPLOAD_BACKEND: str = os.getenv("UPLOAD_BACKEND", "cloudinary")  # "cloudinary", or "local" for offline runs
+    UPLOAD_CONCURRENCY: int = int(os.getenv("UPLOAD_CONCURRENCY", "8"))
+    LOCAL_UPLOAD_DIR: str = os.getenv("LOCAL_UPLOAD_DIR", "uploads")
+    LOCAL_UPLOAD_LATENCY_MS: int = int(os.getenv("LOCAL_UPLOAD_LATENCY_MS", "0"))
+    STOCK_RESERVATION_TTL_SECONDS: int = int(os.getenv("STOCK_RESERVATION_TTL_SECONDS", "900"))
+    STOCK_SWEEP_INTERVAL_SECONDS: int = int(os.getenv("STOCK_SWEEP_INTERVAL_SECONDS", "60"))
+    STOCK_HOT_SKU_GATE: bool = os.getenv("STOCK_HOT_SKU_GATE", "false").lower() == "true"
+    NOTIFICATION_DISPATCH_INTERVAL_SECONDS: float = float(os.getenv("NOTIFICATION_DISPATCH_INTERVAL_SECONDS", "2"))
+    NOTIFICATION_DISPATCH_BATCH_SIZE: int = int(os.getenv("NOTIFICATION_DISPATCH_BATCH_SIZE", "200"))
+    ARCHIVE_DIR: str = os.getenv("ARCHIVE_DIR", "archive")
+    ARCHIVE_BATCH_SIZE: int = int(os.getenv("ARCHIVE_BATCH_SIZE", "1000"))
+    NOTIFICATION_RETENTION_DAYS: int = int(os.getenv("NOTIFICATION_RETENTION_DAYS", "180"))
+    MESSAGE_RETENTION_DAYS: int = int(os.getenv("MESSAGE_RETENTION_DAYS", "365"))
 
 settings = Settings()
 
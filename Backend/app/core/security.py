@@ -1,15 +1,37 @@
 from passlib.context import CryptContext
 import jwt
 from jwt.exceptions import ExpiredSignatureError, InvalidTokenError
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from typing import Optional, Tuple
+from fastapi import HTTPException, status
 from app.core.config import settings
+from app.utils.metrics import get_histogram, get_histogram_metrics
+import asyncio
+import time
 
 JWT_SECRET = settings.SECRET_KEY
 JWT_ALGORITHM = settings.ALGORITHM
 JWT_EXPIRATION_MINUTES = settings.JWT_EXPIRATION_MINUTES
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# min_rounds == max_rounds makes verify_and_update flag any hash made with a different cost,
+# so changing BCRYPT_ROUNDS rehashes passwords on the next successful login.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS
+)
+
+# bcrypt releases the GIL, so a small dedicated thread pool hashes in parallel without
+# sharing AnyIO's default threadpool with the rest of the app. The semaphore admits one
+# job per thread; at most PASSWORD_HASH_MAX_QUEUE more wait for it, the rest get a 503.
+password_executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+_admission = asyncio.Semaphore(settings.PASSWORD_HASH_WORKERS)
+hashing_stats = {"waiting": 0, "rejected": 0}
+
 
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
@@ -17,8 +39,53 @@ def hash_password(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
-def create_access_token(data: dict) -> str:
+def _verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+async def _run_hashing(operation: str, func, *args):
+    if hashing_stats["waiting"] >= settings.PASSWORD_HASH_MAX_QUEUE:
+        hashing_stats["rejected"] += 1
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-in attempts in progress, please try again shortly."
+        )
+
+    queued_at = time.perf_counter()
+    hashing_stats["waiting"] += 1
+    try:
+        await _admission.acquire()
+    finally:
+        hashing_stats["waiting"] -= 1
+
+    try:
+        started = time.perf_counter()
+        get_histogram("password.queue_wait").observe((started - queued_at) * 1000)
+        result = await asyncio.get_running_loop().run_in_executor(password_executor, func, *args)
+        get_histogram(f"password.{operation}").observe((time.perf_counter() - started) * 1000)
+        return result
+    finally:
+        _admission.release()
+
+async def hash_password_async(password: str) -> str:
+    return await _run_hashing("hash", hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Returns (valid, new_hash). new_hash is set when the stored hash should be replaced."""
+    return await _run_hashing("verify", _verify_and_update, plain_password, hashed_password)
+
+def get_hashing_metrics() -> dict:
+    return {
+        **hashing_stats,
+        "workers": settings.PASSWORD_HASH_WORKERS,
+        "bcrypt_rounds": settings.BCRYPT_ROUNDS,
+        **get_histogram_metrics("password."),
+    }
+
+def create_access_token(data: dict, principal=None) -> str:
+    """`principal` (a Principal) adds signed role claims read by the current_principal dependency."""
     to_encode = data.copy()
+    if principal is not None:
+        to_encode.update(principal.claims())
     expire = datetime.utcnow() + timedelta(minutes=JWT_EXPIRATION_MINUTES)
     to_encode.update({"exp": expire, "type": "access"})
     return jwt.encode(to_encode, JWT_SECRET, algorithm=JWT_ALGORITHM)
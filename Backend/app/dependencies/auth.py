@@ -5,44 +5,97 @@ from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 from app.models.users import User
 from app.dependencies.database import get_db
-from app.core.security import decode_token, is_token_valid
+from app.core.security import decode_token
 from app.core.config import settings
+from app.utils.principal_cache import Principal, get_cached_principal, set_cached_principal, get_token_version
 import logging
 
 logger = logging.getLogger(__name__)
 bearer_scheme = HTTPBearer()
 
 
-async def current_user(
-    request: Request,
-    db: AsyncSession = Depends(get_db)
-) -> User:
-    token = request.cookies.get("access_token")
+def get_request_token(request: Request):
+    """The bearer token from the Authorization header, falling back to the access_token cookie."""
     header_token = request.headers.get("Authorization")
-    if header_token and header_token.startswith("Bearer "):
-        token_from_header = header_token.split(" ")[1]
+    if header_token:
+        scheme, _, token = header_token.partition(" ")
+        return token if scheme == "Bearer" and token else None
+    return request.cookies.get("access_token")
 
-    
-    if not token or (header_token and not token_from_header): 
+
+def _decode_request_token(request: Request) -> dict:
+    token = get_request_token(request)
+    if not token:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing access token")
 
-    try:
-        jwt_payload = decode_token(token_from_header if header_token else token, settings.SECRET_KEY, [settings.ALGORITHM])
+    jwt_payload = decode_token(token, settings.SECRET_KEY, [settings.ALGORITHM])
+    if not jwt_payload:
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    if not jwt_payload.get("user_id"):
+        raise HTTPException(status_code=401, detail="Invalid token payload")
+    # Lets the rate limiter key this request by user without decoding the token again.
+    request.state.jwt_payload = jwt_payload
+    return jwt_payload
 
-        if jwt_payload and is_token_valid(token_from_header if header_token else token, settings.SECRET_KEY, [settings.ALGORITHM]):
-            
-            user_id = jwt_payload.get("user_id")
-            if not user_id:
-                raise HTTPException(status_code=401, detail="Invalid token payload")
 
+async def _load_principal(db: AsyncSession, jwt_payload: dict) -> Principal:
+    user_id = jwt_payload["user_id"]
+    principal = await get_cached_principal(user_id)
+
+    if not principal:
+        try:
             result = await db.execute(
                 select(User).options(selectinload(User.seller)).where(User.id == user_id)
             )
             user = result.scalar_one_or_none()
-            if not user:
-                raise HTTPException(status_code=404, detail="User not found")
-            return user
+        except Exception as e:
+            logger.warning("User lookup for token failed: %s", e)
+            raise HTTPException(status_code=401, detail="Invalid token")
+
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+
+        principal = Principal.from_user(user)
+        await set_cached_principal(principal)
+
+    # Tokens minted before role claims existed carry no version and are accepted until they expire.
+    if jwt_payload.get("ver", principal.token_version) < principal.token_version:
+        raise HTTPException(status_code=401, detail="Token has been revoked")
+    return principal
+
+
+async def current_user(
+    request: Request,
+    db: AsyncSession = Depends(get_db)
+) -> Principal:
+    """
+    Resolve the caller to a cached Principal. The session is only used on a cache miss;
+    AsyncSession connects lazily, so cache hits never check out a database connection.
+    """
+    return await _load_principal(db, _decode_request_token(request))
+
+
+async def current_principal(
+    request: Request,
+    db: AsyncSession = Depends(get_db)
+) -> Principal:
+    """
+    Stateless variant of current_user for endpoints that only need id, is_seller, is_admin
+    and seller: the Principal is rebuilt from the token's signed role claims. The only lookup
+    is the user's token version in Redis, so role changes revoke older tokens. Falls back to
+    current_user's path for tokens without claims or when Redis is down.
+    """
+    jwt_payload = _decode_request_token(request)
+    if "ver" not in jwt_payload:
+        return await _load_principal(db, jwt_payload)
+
+    try:
+        latest_version = await get_token_version(jwt_payload["user_id"])
     except Exception as e:
-        logger.warning("JWT token verification failed: %s", e)
+        logger.warning("Token version lookup failed, loading the user instead: %s", e)
+        return await _load_principal(db, jwt_payload)
 
-    raise HTTPException(status_code=401, detail="Invalid token")
+    if latest_version is not None and jwt_payload["ver"] < latest_version:
+        raise HTTPException(status_code=401, detail="Token has been revoked")
+    return Principal.from_claims(jwt_payload)
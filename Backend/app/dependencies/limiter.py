@@ -1,14 +1,72 @@
+import time
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from fastapi.responses import JSONResponse
-from fastapi import status
+from fastapi import Request, status
+from app.core.config import settings
+from app.core.security import decode_token
+from app.dependencies.auth import get_request_token
+from app.utils.metrics import get_histogram, get_histogram_metrics
 
+limiter_stats = {"rejected": 0}
 
-limiter = Limiter(key_func=get_remote_address)
+
+def rate_limit_key(request: Request) -> str:
+    """
+    Bucket signed-in callers by user id so users behind one NAT don't share a limit, and
+    anonymous callers by IP. Reuses the payload current_user already decoded when present.
+    """
+    if settings.RATE_LIMIT_KEY == "user":
+        payload = getattr(request.state, "jwt_payload", None)
+        if payload is None:
+            token = get_request_token(request)
+            payload = decode_token(token, settings.SECRET_KEY, [settings.ALGORITHM]) if token else None
+        if payload and payload.get("user_id"):
+            return f"user:{payload['user_id']}"
+    return f"ip:{get_remote_address(request)}"
+
+
+class TimedLimiter(Limiter):
+    """Records how long each limit check takes, storage round-trips included."""
+
+    def _check_request_limit(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return super()._check_request_limit(*args, **kwargs)
+        finally:
+            get_histogram("rate_limit.check").observe((time.perf_counter() - started) * 1000)
+
+
+# Counters live in Redis so every worker shares them and they survive restarts. If Redis is
+# unreachable the limits fall back to per-worker memory until it comes back.
+#
+# Known trade-off: slowapi checks limits synchronously, so with Redis storage every limited
+# request makes one blocking round-trip on the event loop, and up to the socket timeout while
+# Redis is failing. fixed-window (the default) keeps that to a single O(1) INCR script;
+# moving-window keeps a per-key log and costs more. Measure with app.scripts.rate_limit_bench.
+STORAGE_OPTIONS = {"socket_connect_timeout": 0.5, "socket_timeout": 0.5} if settings.RATE_LIMIT_STORAGE_URI.startswith("redis") else {}
+
+limiter = TimedLimiter(
+    key_func=rate_limit_key,
+    storage_uri=settings.RATE_LIMIT_STORAGE_URI,
+    storage_options=STORAGE_OPTIONS,
+    strategy=settings.RATE_LIMIT_STRATEGY,
+    key_prefix="ratelimit",
+    in_memory_fallback_enabled=True
+)
 
 def rate_limit_exceeded_handler(request, exc):
+    limiter_stats["rejected"] += 1
     return JSONResponse(
         status_code=status.HTTP_429_TOO_MANY_REQUESTS,
         content={"detail": "Rate limit exceeded. Try again later."},
     )
+
+def get_limiter_metrics() -> dict:
+    return {
+        **limiter_stats,
+        "storage": settings.RATE_LIMIT_STORAGE_URI.split("://")[0],
+        "strategy": settings.RATE_LIMIT_STRATEGY,
+        **get_histogram_metrics("rate_limit."),
+    }
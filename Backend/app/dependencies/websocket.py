@@ -1,41 +1,229 @@
-
-from typing import List, Dict
-from fastapi import WebSocket
+from typing import Awaitable, Callable, Dict, Optional
+from fastapi import WebSocket, status
+from app.core.config import settings
+from app.utils.cache import get_redis
+from app.utils.logger import logger
 import asyncio
+import json
+
+Handler = Callable[[str], Awaitable[None]]
+
+
+class InMemoryBroker:
+    """Single-process broker: publish hands the payload straight to the local handler. Used in tests."""
 
-class ConnectionManager:
     def __init__(self):
-        self.active_connections: Dict[int, List[WebSocket]] = {}
+        self.handlers: Dict[str, Handler] = {}
+
+    def subscribe(self, channel: str, handler: Handler):
+        self.handlers[channel] = handler
+
+    async def publish(self, channel: str, data: str):
+        handler = self.handlers.get(channel)
+        if handler:
+            await handler(data)
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+
+class RedisBroker:
+    """
+    Redis pub/sub broker. Every worker publishes to the shared channels and holds a single
+    subscription for all of them, routing each payload to the manager that owns the channel.
+    """
+
+    def __init__(self, reconnect_delay: float = 1.0):
+        self.handlers: Dict[str, Handler] = {}
+        self.reconnect_delay = reconnect_delay
+        self._listener: Optional[asyncio.Task] = None
+
+    def subscribe(self, channel: str, handler: Handler):
+        self.handlers[channel] = handler
+
+    async def publish(self, channel: str, data: str):
+        await get_redis().publish(channel, data)
+
+    async def start(self):
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+    async def _listen(self):
+        while True:
+            pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(*self.handlers)
+                logger.info(f"WebSocket broker subscribed to {sorted(self.handlers)}")
+                async for message in pubsub.listen():
+                    handler = self.handlers.get(message["channel"])
+                    if handler is None:
+                        continue
+                    try:
+                        await handler(message["data"])
+                    except Exception as e:
+                        logger.error(f"WebSocket broker failed to deliver on {message['channel']}: {e}")
+                logger.warning(f"WebSocket broker subscription ended, retrying in {self.reconnect_delay}s")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"WebSocket broker subscription lost, retrying in {self.reconnect_delay}s: {e}")
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+            # Back off on every way out of the subscription, not only on errors,
+            # so a listen() that returns right away cannot spin on resubscribing.
+            await asyncio.sleep(self.reconnect_delay)
+
+
+if settings.WEBSOCKET_BROKER == "memory":
+    broker = InMemoryBroker()
+else:
+    broker = RedisBroker()
+
+
+def _dumps(message: dict) -> str:
+    # Same compact encoding as WebSocket.send_json, done once per message instead of per socket.
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+class ClientConnection:
+    """
+    One socket with a bounded send queue drained by its own writer task, so a slow client
+    only ever delays itself. When the queue is full the manager's slow-consumer policy
+    applies: "drop_oldest" discards the oldest queued message, "disconnect" closes the socket.
+    """
+
+    def __init__(self, manager: "ConnectionManager", websocket: WebSocket, user_id: int):
+        self.manager = manager
+        self.websocket = websocket
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.WEBSOCKET_SEND_QUEUE_SIZE)
+        self.writer = asyncio.create_task(self._write())
+
+    def enqueue(self, text: str):
+        try:
+            self.queue.put_nowait(text)
+            return
+        except asyncio.QueueFull:
+            pass
+
+        if settings.WEBSOCKET_SLOW_CONSUMER_POLICY == "disconnect":
+            self.manager.stats["slow_consumer_disconnects"] += 1
+            logger.warning(f"Closing slow {self.manager.channel} consumer for user {self.user_id}")
+            self.manager.disconnect(self.websocket, self.user_id)
+            asyncio.create_task(self._close())
+            return
+
+        self.queue.get_nowait()
+        self.manager.stats["dropped_messages"] += 1
+        self.queue.put_nowait(text)
+
+    async def _write(self):
+        try:
+            while True:
+                text = await self.queue.get()
+                await asyncio.wait_for(self.websocket.send_text(text), settings.WEBSOCKET_SEND_TIMEOUT_SECONDS)
+                self.manager.stats["sent_messages"] += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.info(f"Dropping {self.manager.channel} socket for user {self.user_id}: {e!r}")
+            self.manager.disconnect(self.websocket, self.user_id)
+
+    async def _close(self):
+        try:
+            await self.websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        except Exception:
+            pass
+
+
+class ConnectionManager:
+    def __init__(self, name: str, broker):
+        self.active_connections: Dict[int, Dict[WebSocket, ClientConnection]] = {}
+        self.clients: Dict[WebSocket, ClientConnection] = {}
+        self.stats = {"sent_messages": 0, "dropped_messages": 0, "slow_consumer_disconnects": 0}
+        self.channel = f"ws:{name}"
+        self.broker = broker
+        broker.subscribe(self.channel, self._on_broker_message)
 
     async def connect(self, websocket: WebSocket, user_id: int):
         await websocket.accept()
-        if user_id not in self.active_connections:
-            self.active_connections[user_id] = []
-        self.active_connections[user_id].append(websocket)
+        client = ClientConnection(self, websocket, user_id)
+        self.clients[websocket] = client
+        self.active_connections.setdefault(user_id, {})[websocket] = client
 
     async def send_message(self, message: dict, user_id: int):
-        if user_id in self.active_connections:
-            for connection in self.active_connections[user_id]:
-                try:
-                    await connection.send_json(message)
-                except Exception:
-                    self.disconnect(connection, user_id)
+        """Deliver to the user's sockets on every worker. Falls back to local sockets if the broker is down."""
+        text = _dumps(message)
+        try:
+            await self.broker.publish(self.channel, f"{user_id}:{text}")
+        except Exception as e:
+            logger.warning(f"Broker publish on {self.channel} failed, delivering locally only: {e}")
+            self.send_local_text(text, user_id)
+
+    async def _on_broker_message(self, data: str):
+        user_id, _, text = data.partition(":")
+        self.send_local_text(text, int(user_id))
+
+    async def send_local(self, message: dict, user_id: int):
+        self.send_local_text(_dumps(message), user_id)
 
+    def send_local_text(self, text: str, user_id: int):
+        """Queue an already encoded message on each of the user's local sockets. Never blocks."""
+        for client in list(self.active_connections.get(user_id, {}).values()):
+            client.enqueue(text)
 
     async def heartbeat(self, websocket: WebSocket, interval: int = 30):
+        connected = False
         while True:
-            try:
-                await websocket.send_text("ping")
-                await asyncio.sleep(interval)
-            except Exception:
+            client = self.clients.get(websocket)
+            if client is None and connected:
                 break
-    
+            if client is not None:
+                connected = True
+                client.enqueue("ping")
+            await asyncio.sleep(interval)
+
     def disconnect(self, websocket: WebSocket, user_id: int):
-        if user_id in self.active_connections:
-            self.active_connections[user_id].remove(websocket)
-            if not self.active_connections[user_id]:
-                del self.active_connections[user_id]
+        client = self.clients.pop(websocket, None)
+        if client is None:
+            return
+        client.writer.cancel()
+        connections = self.active_connections.get(client.user_id)
+        if connections is not None:
+            connections.pop(websocket, None)
+            if not connections:
+                del self.active_connections[client.user_id]
+
+    def get_metrics(self) -> dict:
+        return {
+            **self.stats,
+            "users": len(self.active_connections),
+            "connections": len(self.clients),
+            "queued_messages": sum(client.queue.qsize() for client in self.clients.values()),
+        }
+
+
+notification_manager = ConnectionManager("notifications", broker)
+chat_manager = ConnectionManager("chat", broker)
 
 
-notification_manager = ConnectionManager()
-chat_manager = ConnectionManager()
\ No newline at end of file
+def get_websocket_metrics() -> dict:
+    return {
+        "notifications": notification_manager.get_metrics(),
+        "chat": chat_manager.get_metrics(),
+    }
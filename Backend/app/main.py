@@ -1,21 +1,42 @@
 from fastapi import FastAPI
 from fastapi.requests import Request
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
+import asyncio
 from fastapi.middleware.cors import CORSMiddleware
 from app.db.database import engine, Base
 from app.routers import auth, users, admin, notification, sellers, products, service, cart, orders, chat, conversation
 from slowapi.errors import RateLimitExceeded
 from app.dependencies.limiter import rate_limit_exceeded_handler, limiter
 from app.utils.logger import logger
+from app.utils.cache import init_redis, close_redis
+from app.services.stock import run_reservation_sweeper
+from app.services.notification import run_notification_dispatcher
+from app.dependencies.websocket import broker
+from app.utils.mail_queue import mail_queue
 
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     async with engine.begin() as conn:
+        await init_redis()
+        await broker.start()
+        await mail_queue.start()
         logger.info("Application startup complete.")
+    background_tasks = [
+        asyncio.create_task(run_reservation_sweeper()),
+        asyncio.create_task(run_notification_dispatcher()),
+    ]
     yield
     logger.info("Shutting down application.")
+    for task in background_tasks:
+        task.cancel()
+    for task in background_tasks:
+        with suppress(asyncio.CancelledError):
+            await task
+    await mail_queue.stop()
+    await broker.stop()
+    await close_redis()
 
 app = FastAPI(lifespan=lifespan)
 
@@ -1,10 +1,10 @@
 from .users import User
-from .sellers import Seller
+from .sellers import Seller, SellerStats
 from .category import ProductCategory, ServiceCategory
 from .products import Product, ProductImage, ProductVariant, VariantCategory, VariantAttribute, variant_attribute_values
 from .services import Service, ServiceImage
-from .cart import Cart, CartItem
+from .cart import Cart, CartItem, StockReservation
 from .orders import Order, OrderItem
-from .notification import Notification
+from .notification import Notification, NotificationOutbox
 from .conversation import Conversation, Message, MessageImage
 from .inquiries import ServiceInquiry
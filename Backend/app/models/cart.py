@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, Integer, String, Float, Boolean, ForeignKey
+from sqlalchemy import Column, DateTime, Integer, String, Float, Boolean, ForeignKey, Index
 from datetime import datetime
 from app.db.database import Base
 from sqlalchemy.orm import relationship
@@ -27,4 +27,20 @@ class CartItem(Base):
 
     cart = relationship("Cart", back_populates="items")
     product = relationship("Product", back_populates="cart_items")
-    variant = relationship("ProductVariant", back_populates="cart_items")
\ No newline at end of file
+    variant = relationship("ProductVariant", back_populates="cart_items")
+
+class StockReservation(Base):
+    """Units taken out of Product/ProductVariant stock on behalf of a cart item until checkout or expiry."""
+    __tablename__ = 'stock_reservations'
+
+    id = Column(Integer, primary_key=True, index=True)
+    cart_item_id = Column(Integer, ForeignKey('cart_items.id', ondelete='SET NULL'), nullable=True, unique=True)
+    product_id = Column(Integer, ForeignKey('products.id'), nullable=False)
+    variant_id = Column(Integer, ForeignKey('product_variants.id'), nullable=True)
+    quantity = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("ix_stock_reservations_expires_at", "expires_at"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, String, Boolean, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, String, Boolean, DateTime, Index, text
 from sqlalchemy.orm import relationship
 from app.db.database import Base
 from datetime import datetime
@@ -10,11 +10,22 @@ class Conversation(Base):
     sender_id = Column(Integer, ForeignKey('users.id'), nullable=False)
     receiver_id = Column(Integer, ForeignKey('users.id'), nullable=False)
     started_at = Column(DateTime, default=datetime.utcnow)
+    # Denormalized by send_new_message so the inbox needs no per-conversation message lookups.
+    # last_message_id carries no foreign key so archived messages can be removed freely.
+    last_message_id = Column(Integer, nullable=True)
+    last_message_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    sender_unread_count = Column(Integer, default=0, nullable=False)
+    receiver_unread_count = Column(Integer, default=0, nullable=False)
 
     sender = relationship("User", foreign_keys=[sender_id], back_populates="sent_conversations")
     receiver = relationship("User", foreign_keys=[receiver_id], back_populates="received_conversations")
     messages = relationship("Message", back_populates="conversation", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index("ix_conversations_sender_last_message_at", "sender_id", "last_message_at"),
+        Index("ix_conversations_receiver_last_message_at", "receiver_id", "last_message_at"),
+    )
+
 
 class Message(Base):
     __tablename__ = 'messages'
@@ -30,6 +41,11 @@ class Message(Base):
     conversation = relationship("Conversation", back_populates="messages")
     images = relationship("MessageImage", back_populates="message", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index("ix_messages_conversation_timestamp_id", "conversation_id", "timestamp", "id"),
+        Index("ix_messages_conversation_id_unread", "conversation_id", "id", postgresql_where=text("is_read = false")),
+    )
+
 
 class MessageImage(Base):
     __tablename__ = 'message_images'
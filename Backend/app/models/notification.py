@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey
+from sqlalchemy import Column, DateTime, Integer, String, Float, Boolean, ForeignKey, Index, text
 from datetime import datetime
 from app.db.database import Base
 from sqlalchemy.orm import relationship
@@ -11,8 +11,27 @@ class Notification(Base):
     seller_id = Column(Integer, ForeignKey('sellers.id'), nullable=True)
     role = Column(String, nullable=False)  # 'user' or 'seller'
     message = Column(String, nullable=False)
-    is_read = Column(Boolean, default=False)
-    created_at = Column(String, default=datetime.utcnow().isoformat())
+    is_read = Column(Boolean, default=False, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     user = relationship("User", back_populates="notifications")
-    seller = relationship("Seller", back_populates="notifications")
\ No newline at end of file
+    seller = relationship("Seller", back_populates="notifications")
+
+    __table_args__ = (
+        Index("ix_notifications_user_id_unread", "user_id", postgresql_where=text("is_read = false")),
+        Index("ix_notifications_seller_id_unread", "seller_id", postgresql_where=text("is_read = false")),
+        # Unread-first feed order: is_read, created_at DESC, id DESC.
+        Index("ix_notifications_user_feed", "user_id", "is_read", text("created_at DESC"), text("id DESC")),
+        Index("ix_notifications_seller_feed", "seller_id", "is_read", text("created_at DESC"), text("id DESC")),
+    )
+
+class NotificationOutbox(Base):
+    """Notifications written in the caller's transaction, moved into `notifications` and pushed by the dispatcher."""
+    __tablename__ = 'notification_outbox'
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=True)
+    seller_id = Column(Integer, ForeignKey('sellers.id'), nullable=True)
+    role = Column(String, nullable=False)
+    message = Column(String, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
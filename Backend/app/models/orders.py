@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, Index
 from datetime import datetime
 from app.db.database import Base
 from sqlalchemy.orm import relationship
@@ -25,6 +25,11 @@ class Order(Base):
     seller = relationship("Seller", back_populates="orders")
     items = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index("ix_orders_seller_id_status", "seller_id", "status"),
+        Index("ix_orders_seller_id_created_at", "seller_id", "created_at"),
+    )
+
 
 class OrderItem(Base):
     __tablename__ = 'order_items'
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, Table
+from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, Table, Index
 from datetime import datetime
 from app.db.database import Base
 from sqlalchemy.orm import relationship
@@ -20,7 +20,7 @@ class Product(Base):
     stock = Column(Integer, default=0)
     description = Column(String, nullable=True)
     has_variants = Column(Boolean, default=False)
-    created_at = Column(String, default=datetime.utcnow().isoformat())
+    created_at = Column(String, default=lambda: datetime.utcnow().isoformat())
 
     seller = relationship("Seller", back_populates="products")
     images = relationship("ProductImage", back_populates="product", cascade="all, delete-orphan")
@@ -30,6 +30,13 @@ class Product(Base):
     cart_items = relationship("CartItem", back_populates="product")
     order_items = relationship("OrderItem", back_populates="product")
 
+    __table_args__ = (
+        Index("ix_products_created_at_id", "created_at", "id"),
+        Index("ix_products_category_created_at_id", "category_id", "created_at", "id"),
+        Index("ix_products_seller_created_at_id", "seller_id", "created_at", "id"),
+        Index("ix_products_base_price", "base_price"),
+    )
+
 class ProductImage(Base):
     __tablename__ = 'product_images'
 
@@ -43,7 +50,7 @@ class ProductVariant(Base):
     __tablename__ = 'product_variants'
 
     id = Column(Integer, primary_key=True, index=True)
-    product_id = Column(Integer, ForeignKey('products.id'), nullable=False)
+    product_id = Column(Integer, ForeignKey('products.id'), nullable=False, index=True)
     variant_name = Column(String, nullable=False)
     stock = Column(Integer, default=0)
     price = Column(Float, nullable=False)
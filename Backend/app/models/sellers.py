@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Boolean, DateTime
+from datetime import datetime
 from app.db.database import Base
 from sqlalchemy.orm import relationship
 
@@ -22,4 +23,23 @@ class Seller(Base):
     services = relationship("Service", back_populates="seller", cascade="all, delete-orphan")
     orders = relationship("Order", back_populates="seller")
     service_inquiries = relationship("ServiceInquiry", back_populates="seller")
-    notifications = relationship("Notification", back_populates="seller")
\ No newline at end of file
+    notifications = relationship("Notification", back_populates="seller")
+    stats = relationship("SellerStats", back_populates="seller", uselist=False, cascade="all, delete-orphan")
+
+
+class SellerStats(Base):
+    """Per-seller counters kept in step with order transitions; rebuilt by app.scripts.rebuild_seller_stats."""
+    __tablename__ = 'seller_stats'
+
+    seller_id = Column(Integer, ForeignKey('sellers.id'), primary_key=True)
+    total_revenue = Column(Float, nullable=False, default=0.0, index=True)
+    total_orders = Column(Integer, nullable=False, default=0)
+    pending_orders = Column(Integer, nullable=False, default=0)
+    confirmed_orders = Column(Integer, nullable=False, default=0)
+    shipped_orders = Column(Integer, nullable=False, default=0)
+    delivered_orders = Column(Integer, nullable=False, default=0)
+    cancelled_orders = Column(Integer, nullable=False, default=0)
+    product_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    seller = relationship("Seller", back_populates="stats")
\ No newline at end of file
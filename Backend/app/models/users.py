@@ -16,6 +16,8 @@ class User(Base):
     contact_number = Column(String, nullable=True)
     is_seller = Column(Boolean, default=False)
     is_admin = Column(Boolean, default=False)
+    # Bumped on role changes; access tokens carrying an older version are rejected.
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
 
     seller = relationship("Seller", back_populates="user", uselist=False, cascade="all, delete-orphan")
     service_inquiries = relationship("ServiceInquiry", back_populates="user")
@@ -1,14 +1,23 @@
-from fastapi import APIRouter, Depends, status, Request, HTTPException
+from fastapi import APIRouter, Depends, status, Request, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 from app.dependencies.database import get_db
 from app.dependencies.auth import current_user
 from app.services.admin import add_product_category, add_service_category, approve_seller, get_sellers_applications, get_all_sellers, get_all_users
 from app.services.auth import create_admin_user
+from app.services.seller_stats import get_seller_rankings
+from app.services.stock import arm_hot_sku, disarm_hot_sku
 from app.schemas.users import UserBase
 from app.schemas.auth import AdminRegister
 from app.schemas.category import ProductCategoryCreate, ServiceCategoryCreate
 from app.models.users import User
-from app.dependencies.limiter import limiter
+from app.dependencies.limiter import limiter, get_limiter_metrics
+from app.utils.product_cache import get_product_cache_stats
+from app.utils.principal_cache import get_principal_cache_stats
+from app.utils.cache import get_pool_metrics
+from app.dependencies.websocket import get_websocket_metrics
+from app.core.security import get_hashing_metrics
+from app.utils.mail_queue import mail_queue
 
 router = APIRouter()
 
@@ -87,6 +96,23 @@ async def get_sellers(
         )
     return await get_all_sellers(db)
 
+@router.get("/sellers/ranking", status_code=status.HTTP_200_OK)
+@limiter.limit("10/minute")
+async def rank_sellers(
+    request: Request,
+    metric: str = "total_revenue",
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(current_user)
+):
+    """Rank sellers by a seller_stats counter. Admin only."""
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to perform this action"
+        )
+    return await get_seller_rankings(db, metric, limit)
+
 @router.get("/users", status_code=status.HTTP_200_OK)
 @limiter.limit("10/minute")
 async def get_users(
@@ -116,4 +142,60 @@ async def verify_seller(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to perform this action"
         )
-    return await approve_seller(db, seller_id)
\ No newline at end of file
+    return await approve_seller(db, seller_id)
+
+@router.post("/hot-skus", status_code=status.HTTP_200_OK)
+@limiter.limit("10/minute")
+async def arm_stock_gate(
+    request: Request,
+    product_id: int,
+    variant_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(current_user)
+):
+    """Put a SKU behind the Redis stock gate for a flash sale. Admin only."""
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to perform this action"
+        )
+    return await arm_hot_sku(db, product_id, variant_id)
+
+@router.delete("/hot-skus", status_code=status.HTTP_200_OK)
+@limiter.limit("10/minute")
+async def disarm_stock_gate(
+    request: Request,
+    product_id: int,
+    variant_id: Optional[int] = None,
+    current_user: User = Depends(current_user)
+):
+    """Take a SKU off the Redis stock gate. Admin only."""
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to perform this action"
+        )
+    await disarm_hot_sku(product_id, variant_id)
+    return {"detail": "Stock gate removed."}
+
+@router.get("/metrics", status_code=status.HTTP_200_OK)
+@limiter.limit("30/minute")
+async def get_metrics(
+    request: Request,
+    current_user: User = Depends(current_user)
+):
+    """Runtime counters for this worker process. Admin only."""
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to perform this action"
+        )
+    return {
+        "product_cache": get_product_cache_stats(),
+        "principal_cache": get_principal_cache_stats(),
+        "redis_pool": get_pool_metrics(),
+        "websockets": get_websocket_metrics(),
+        "password_hashing": get_hashing_metrics(),
+        "mail_queue": mail_queue.get_metrics(),
+        "rate_limiter": get_limiter_metrics()
+    }
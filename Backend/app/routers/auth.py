@@ -69,16 +69,18 @@ async def reset_password_endpoint(
 @router.post("/token/refresh")
 @limiter.limit("15/minute")
 async def refresh_token(
-    request: Request
+    request: Request,
+    db: AsyncSession = Depends(get_db)
 ):
     """Refresh access token using a valid refresh token."""
-    return await token_refresh(request)
+    return await token_refresh(db, request)
 
 @router.post("/token-refresh-mobile")
 @limiter.limit("15/minute")
 async def refresh_token_mobile(
     request: Request,
-    token: str
+    token: str,
+    db: AsyncSession = Depends(get_db)
 ):
     """Refresh access token using a valid refresh token for mobile clients."""
-    return await refresh_token_for_mobile(token)
\ No newline at end of file
+    return await refresh_token_for_mobile(db, token)
\ No newline at end of file
@@ -1,10 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.dependencies.database import get_db
-from app.dependencies.auth import current_user
+from app.dependencies.auth import current_principal
+from app.utils.principal_cache import Principal
 from app.dependencies.limiter import limiter
 from app.services.cart import get_cart_by_user, get_cart_items, add_item_to_cart, remove_item_from_cart, clear_cart, edit_cart_item
-from app.models.users import User
 from app.schemas.cart import CartItemBase
 
 router = APIRouter()
@@ -14,7 +14,7 @@ router = APIRouter()
 async def get_user_cart(
     request: Request,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(current_user)
+    current_user: Principal = Depends(current_principal)
 ):
     """Get the current user's cart details."""
     if not current_user:
@@ -35,7 +35,7 @@ async def add_item_to_cart_endpoint(
     request: Request,
     item_data: CartItemBase,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(current_user)
+    current_user: Principal = Depends(current_principal)
 ):
     """Add an item to the current user's cart."""
     if not current_user:
@@ -54,7 +54,7 @@ async def update_cart_item_endpoint(
     item_id: int,
     quantity: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(current_user)
+    current_user: Principal = Depends(current_principal)
 ):
     """Update an item in the current user's cart."""
     if not current_user:
@@ -72,7 +72,7 @@ async def remove_item_from_cart_endpoint(
     request: Request,
     item_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(current_user)
+    current_user: Principal = Depends(current_principal)
 ):
     """Remove an item from the current user's cart."""
     if not current_user:
@@ -89,7 +89,7 @@ async def remove_item_from_cart_endpoint(
 async def clear_cart_endpoint(
     request: Request,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(current_user)
+    current_user: Principal = Depends(current_principal)
 ):
     """Clear all items from the current user's cart."""
     if not current_user:
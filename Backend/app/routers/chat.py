@@ -2,7 +2,7 @@ from fastapi import APIRouter, HTTPException, Query, UploadFile, WebSocket, Depe
 from app.models.users import User
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.dependencies.database import get_db
-from app.services.chat import get_conversations_for_user, get_messages_for_conversation, send_new_message
+from app.services.chat import get_conversations_for_user, get_messages_for_conversation, send_new_message, get_inbox, mark_messages_as_read
 from typing import List, Optional
 from app.schemas.chat import MessageCreate
 from app.dependencies.websocket import chat_manager
@@ -20,13 +20,42 @@ async def fetch_conversations(
 ):
     return await get_conversations_for_user(db, user.id)
 
+@router.get("/inbox", status_code=status.HTTP_200_OK)
+async def fetch_inbox(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    user = Depends(current_user)
+):
+    """Conversations with last message and unread count, most recent first. Pass `next_cursor` back as `cursor`."""
+    return await get_inbox(db, user.id, limit, cursor)
+
 @router.get("/conversations/{conversation_id}/messages", status_code=status.HTTP_200_OK)
 async def fetch_messages(
     conversation_id: int,
+    limit: int = Query(50, ge=1, le=100),
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    since_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(current_user)
+):
+    """
+    Newest page of messages by default. Pass `before_cursor` back as `before` for older history,
+    and `after_cursor` as `after` (or the last message id as `since_id`) to fetch only newer ones.
+    """
+    return await get_messages_for_conversation(db, conversation_id, limit, before, after, since_id)
+
+
+@router.put("/conversations/{conversation_id}/read", status_code=status.HTTP_200_OK)
+async def read_messages(
+    conversation_id: int,
+    up_to_message_id: int,
     db: AsyncSession = Depends(get_db),
     current_user = Depends(current_user)
 ):
-    return await get_messages_for_conversation(db, conversation_id)
+    """Mark the other participant's messages up to and including `up_to_message_id` as read."""
+    return await mark_messages_as_read(db, conversation_id, current_user.id, up_to_message_id)
 
 
 @router.post("/send-message", status_code=status.HTTP_201_CREATED)
@@ -4,7 +4,8 @@ from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas.orders import OrderCreate, OrderCreateCart
 from app.services.orders import get_orders_by_user, create_new_order, get_order_by_id, cancel_order_by_id, mark_order_as_received, create_order_from_cart
-from app.dependencies.auth import current_user
+from app.dependencies.auth import current_principal
+from app.utils.principal_cache import Principal
 from app.dependencies.database import get_db
 from app.dependencies.limiter import limiter
 
@@ -15,7 +16,7 @@ router = APIRouter()
 async def get_user_orders(
     request: Request,
     db: AsyncSession = Depends(get_db),
-    current_user = Depends(current_user)
+    current_user: Principal = Depends(current_principal)
 ):
     orders = await get_orders_by_user(db, current_user.id)
     return orders
@@ -26,7 +27,7 @@ async def get_order_details(
     request: Request,
     order_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user = Depends(current_user)
+    current_user: Principal = Depends(current_principal)
 ):
     if not current_user:
         raise HTTPException(
@@ -48,7 +49,7 @@ async def checkout_order(
     request: Request,
     order: OrderCreate,
     db: AsyncSession = Depends(get_db),
-    current_user = Depends(current_user)
+    current_user: Principal = Depends(current_principal)
 ):
     if not current_user:
         raise HTTPException(
@@ -65,7 +66,7 @@ async def checkout_order_from_cart(
     request: Request,
     order: OrderCreateCart,
     db: AsyncSession = Depends(get_db),
-    current_user = Depends(current_user)
+    current_user: Principal = Depends(current_principal)
 ):
     if not current_user:
         raise HTTPException(
@@ -82,7 +83,7 @@ async def cancel_order(
     request: Request,
     order_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user = Depends(current_user)
+    current_user: Principal = Depends(current_principal)
 ):
     if not current_user:
         raise HTTPException(
@@ -99,7 +100,7 @@ async def mark_order_received(
     request: Request,
     order_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user = Depends(current_user)
+    current_user: Principal = Depends(current_principal)
 ):
     if not current_user:
         raise HTTPException(
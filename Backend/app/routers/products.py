@@ -1,12 +1,12 @@
 from typing import List, Optional
-from fastapi import HTTPException, status, APIRouter, Depends, Request
+from fastapi import HTTPException, status, APIRouter, Depends, Request, Query
 from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.services.products import get_product_by_id, get_all_products, add_product_service, add_product_images, update_product_service, add_variant_categories_with_attributes, add_product_variants, update_variant_category_service, update_variants, delete_product_service
 from fastapi import Form, File, UploadFile
-from app.models.users import User
 from app.dependencies.database import get_db
-from app.dependencies.auth import current_user
+from app.dependencies.auth import current_principal
+from app.utils.principal_cache import Principal
 from app.dependencies.limiter import limiter
 from app.schemas.product import ProductFullCreate, ProductFullUpdate
 from app.services.products import get_all_product_categories
@@ -17,10 +17,26 @@ router = APIRouter()
 @limiter.limit("50/minute")
 async def get_products(
     request: Request,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    category_id: Optional[int] = None,
+    seller_id: Optional[int] = None,
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    in_stock: Optional[bool] = None,
     db: AsyncSession = Depends(get_db)
 ):
-    
-  return await get_all_products(db)
+    """List products newest first. Pass the returned `next_cursor` back as `cursor` to fetch the next page."""
+    return await get_all_products(
+        db,
+        limit=limit,
+        cursor=cursor,
+        category_id=category_id,
+        seller_id=seller_id,
+        min_price=min_price,
+        max_price=max_price,
+        in_stock=in_stock
+    )
 
 @router.get("/{product_id}")
 @limiter.limit("50/minute")
@@ -45,7 +61,7 @@ async def bulk_update_variants(
     variant_ids: str = Form(...),
     variant_data: str = Form(...),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(current_user)
+    current_user: Principal = Depends(current_principal)
 ):
     if not current_user or not current_user.is_seller:
         raise HTTPException(status_code=403, detail="Only sellers can update variants")
@@ -59,7 +75,7 @@ async def add_images_to_product(
     product_id: int,
     images: List[UploadFile] = File(...),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(current_user)
+    current_user: Principal = Depends(current_principal)
 ):
     if not current_user or not current_user.is_seller:
         raise HTTPException(
@@ -75,7 +91,7 @@ async def add_product_route(
     request: Request,
     data: ProductFullCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(current_user)
+    current_user: Principal = Depends(current_principal)
 ):
     if not current_user or not current_user.is_seller:
         raise HTTPException(
@@ -107,7 +123,7 @@ async def update_product(
     product_id: int,
     data: ProductFullUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(current_user)
+    current_user: Principal = Depends(current_principal)
 ):
     if not current_user or not current_user.is_seller:
         raise HTTPException(
@@ -129,7 +145,7 @@ async def delete_product(
     request: Request,
     product_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(current_user)
+    current_user: Principal = Depends(current_principal)
 ):
     if not current_user or not current_user.is_seller:
         raise HTTPException(
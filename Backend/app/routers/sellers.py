@@ -1,13 +1,13 @@
 from fastapi import HTTPException, status, APIRouter, Depends, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.services.sellers import become_a_seller, get_shop_details, get_all_orders_by_seller, confirm_order_by_id, send_shipping_link, mark_order_as_delivered, get_delivered_orders_count, get_pending_orders_count, get_recent_inquiries, get_recent_orders, get_revenue, get_total_orders_count, get_shipped_orders_count, switch_role
+from app.services.sellers import become_a_seller, get_shop_details, get_all_orders_by_seller, confirm_order_by_id, send_shipping_link, mark_order_as_delivered, get_dashboard_metrics, switch_role
 from app.services.products import get_products_by_seller
 from app.dependencies.database import get_db
-from app.dependencies.auth import current_user
+from app.dependencies.auth import current_principal
+from app.utils.principal_cache import Principal
 from app.services.service import get_services_by_seller
 from app.schemas.sellers import SellerCreate, SwitchRoleRequest
 from app.dependencies.limiter import limiter
-from app.models.users import User
 
 router = APIRouter()
 
@@ -18,7 +18,7 @@ async def apply_as_seller(
     request: Request,
     seller_data: SellerCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(current_user)
+    current_user: Principal = Depends(current_principal)
 ):
     """Endpoint for users to apply as sellers."""
     if not current_user:
@@ -41,7 +41,7 @@ async def switch_seller_role(
     request: Request,
     switch_role_request: SwitchRoleRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(current_user)
+    current_user: Principal = Depends(current_principal)
 ):
     """Endpoint for sellers to switch between buyer and seller roles."""
     # if not current_user or not current_user.is_seller:
@@ -58,7 +58,7 @@ async def send_shipping_link_endpoint(
     order_id: int,
     shipping_link: str,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(current_user)
+    current_user: Principal = Depends(current_principal)
 ):
     if not current_user or not current_user.is_seller:
         raise HTTPException(
@@ -74,7 +74,7 @@ async def send_shipping_link_endpoint(
 async def get_seller_shop(
     request: Request,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(current_user)
+    current_user: Principal = Depends(current_principal)
 ):
     if not current_user and not current_user.is_seller:
         raise HTTPException(
@@ -88,7 +88,7 @@ async def get_seller_shop(
 async def get_seller_dashboard_metrics(
     request: Request,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(current_user)
+    current_user: Principal = Depends(current_principal)
 ):
     if not current_user or not current_user.is_seller:
         raise HTTPException(
@@ -96,32 +96,14 @@ async def get_seller_dashboard_metrics(
             detail="Only sellers can access dashboard metrics."
         )
     
-    seller_id = current_user.seller.id
-
-    total_revenue = await get_revenue(db, seller_id)
-    total_orders = await get_total_orders_count(db, seller_id)
-    pending_orders = await get_pending_orders_count(db, seller_id)
-    shipped_orders = await get_shipped_orders_count(db, seller_id)
-    delivered_orders = await get_delivered_orders_count(db, seller_id)
-    recent_orders = await get_recent_orders(db, seller_id)
-    recent_inquiries = await get_recent_inquiries(db, seller_id)
-
-    return {
-        "total_revenue": total_revenue,
-        "total_orders": total_orders,
-        "pending_orders": pending_orders,
-        "shipped_orders": shipped_orders,
-        "delivered_orders": delivered_orders,
-        "recent_orders": recent_orders,
-        "recent_inquiries": recent_inquiries
-    }
+    return await get_dashboard_metrics(db, current_user.seller.id)
 
 
 @router.get("/my-products", status_code=status.HTTP_200_OK)
 async def get_my_products(
     request: Request,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(current_user)
+    current_user: Principal = Depends(current_principal)
 ):
     if not current_user or not current_user.is_seller:
         raise HTTPException(
@@ -136,7 +118,7 @@ async def get_my_products(
 async def get_my_services(
     request: Request,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(current_user)
+    current_user: Principal = Depends(current_principal)
 ):
     if not current_user or not current_user.is_seller:
         raise HTTPException(
@@ -151,7 +133,7 @@ async def get_my_services(
 async def get_seller_orders(
     request: Request,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(current_user)
+    current_user: Principal = Depends(current_principal)
 ):
     if not current_user or not current_user.is_seller:
         raise HTTPException(
@@ -167,7 +149,7 @@ async def confirm_seller_order(
     request: Request,
     order_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(current_user)
+    current_user: Principal = Depends(current_principal)
 ):
     if not current_user or not current_user.is_seller:
         raise HTTPException(
@@ -184,7 +166,7 @@ async def mark_order_delivered_endpoint(
     request: Request,
     order_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(current_user)
+    current_user: Principal = Depends(current_principal)
 ):
     if not current_user or not current_user.is_seller:
         raise HTTPException(
@@ -1,16 +1,16 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from sqlalchemy import select
-from typing import List
+from typing import List, Optional
 from fastapi import HTTPException, status
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends, Request, Query
 from app.dependencies.auth import current_user
 from app.schemas.users import UserBase, UserUpdate
 from app.models.users import User
 from app.models.notification import Notification
 from app.dependencies.database import get_db
-from app.services.users import get_user_by_id, update_user_details, delete_user, logout_user
-from app.services.notification import get_notifications_for_user
+from app.services.users import get_user_profile, update_user_details, delete_user, logout_user
+from app.services.notification import get_notifications_for_user, count_unread_notifications, mark_notification_as_read, mark_all_notifications_as_read
 from app.dependencies.limiter import limiter
 from app.services.auth import get_current_user_by_token
 
@@ -56,25 +56,61 @@ async def get_user(
             detail="Not authorized to access this user's details"
         )
 
-    return await get_user_by_id(db, current_user.id)
+    return await get_user_profile(db, current_user.id)
 
 @router.get("/notifications", status_code=status.HTTP_200_OK)
 @limiter.limit("15/minute")
 async def get_user_notifications(
     request: Request,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    unread_only: bool = False,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(current_user)
 ):
-    """Get notifications for the current user."""
+    """Get notifications for the current user, unread first. Pass `next_cursor` back as `cursor` for the next page."""
     if not current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to access notifications"
         )
-    if current_user.is_seller:
-        return await get_notifications_for_user(db, current_user.id, seller_id=current_user.seller.id)
-    
-    return await get_notifications_for_user(db, current_user.id)
+    seller_id = current_user.seller.id if current_user.is_seller and current_user.seller else None
+    return await get_notifications_for_user(db, current_user.id, seller_id, limit, cursor, unread_only)
+
+@router.get("/notifications/unread-count", status_code=status.HTTP_200_OK)
+@limiter.limit("60/minute")
+async def get_unread_notification_count(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(current_user)
+):
+    """Number of unread notifications, for badges."""
+    seller_id = current_user.seller.id if current_user.is_seller and current_user.seller else None
+    return {"unread": await count_unread_notifications(db, current_user.id, seller_id)}
+
+@router.put("/notifications/read-all", status_code=status.HTTP_200_OK)
+@limiter.limit("15/minute")
+async def read_all_notifications(
+    request: Request,
+    scope: str = "all",
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(current_user)
+):
+    """Mark every unread notification in `scope` (user, seller or all) as read."""
+    seller_id = current_user.seller.id if current_user.seller else None
+    return await mark_all_notifications_as_read(db, current_user.id, seller_id, scope)
+
+@router.put("/notifications/{notification_id}/read", status_code=status.HTTP_200_OK)
+@limiter.limit("30/minute")
+async def read_notification(
+    request: Request,
+    notification_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(current_user)
+):
+    """Mark one of the current user's notifications as read."""
+    seller_id = current_user.seller.id if current_user.seller else None
+    return await mark_notification_as_read(db, notification_id, current_user.id, seller_id)
 
 @router.put("/update-details", response_model=UserBase)
 @limiter.limit("10/minute")
@@ -1,4 +1,5 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, ConfigDict
+from typing import Optional
 from datetime import datetime
 
 class SellerBase(BaseModel):
@@ -20,5 +21,18 @@ class PublicSeller(SellerBase):
     class Config:
         orm_mode = True
 
+class SellerProfile(BaseModel):
+    id: int
+    business_name: Optional[str] = None
+    business_address: Optional[str] = None
+    business_contact: Optional[str] = None
+    display_name: Optional[str] = None
+    owner_address: Optional[str] = None
+    is_verified: Optional[bool] = None
+    followers: Optional[int] = None
+    ratings: Optional[float] = None
+    is_seller_mode: Optional[bool] = None
+    model_config = ConfigDict(from_attributes=True)
+
 class SwitchRoleRequest(BaseModel):
     is_seller_mode: bool
\ No newline at end of file
@@ -1,7 +1,7 @@
 from pydantic import BaseModel, EmailStr, ConfigDict
 from typing import Optional
 from datetime import date
-from app.schemas.sellers import PublicSeller
+from app.schemas.sellers import PublicSeller, SellerProfile
 
 class UserBase(BaseModel):
     username: str
@@ -18,6 +18,23 @@ class UserBase(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class UserProfile(BaseModel):
+    """The signed-in user's own profile: returned by login and cached for the details endpoints."""
+    id: int
+    username: str
+    email: str
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    middle_name: Optional[str] = None
+    birthdate: Optional[date] = None
+    address: Optional[str] = None
+    contact_number: Optional[str] = None
+    is_admin: bool = False
+    is_seller: bool = False
+    seller: Optional[SellerProfile] = None
+    model_config = ConfigDict(from_attributes=True)
+
+
 class UserUpdate(BaseModel):
     first_name: Optional[str] = None
     middle_name: Optional[str] = None
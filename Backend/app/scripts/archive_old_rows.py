@@ -0,0 +1,37 @@
+"""
+Archive notifications and chat messages past their retention period.
+
+Rows are copied to gzip-compressed JSON Lines files under ARCHIVE_DIR/<table>/ and then
+deleted in batches of --batch-size, one short transaction per batch.
+
+Usage:
+    python -m app.scripts.archive_old_rows
+    python -m app.scripts.archive_old_rows --notification-days 90 --message-days 365 --batch-size 500
+"""
+import argparse
+import asyncio
+from app.db.database import AsyncSessionLocal, engine
+from app.services.archive import archive_old_rows
+from app.utils.logger import logger
+import app.db.base  # register every model with the mapper
+
+
+async def main(notification_days: int | None, message_days: int | None, batch_size: int | None) -> None:
+    async with AsyncSessionLocal() as db:
+        report = await archive_old_rows(db, notification_days, message_days, batch_size)
+    await engine.dispose()
+
+    for table, stats in report.items():
+        logger.info(
+            f"{table}: {stats['rows']} rows, {stats['raw_bytes']} bytes raw, "
+            f"{stats['compressed_bytes']} bytes compressed -> {stats['file'] or 'nothing to archive'}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move old notifications and chat messages to cold storage.")
+    parser.add_argument("--notification-days", type=int, default=None, help="Defaults to NOTIFICATION_RETENTION_DAYS.")
+    parser.add_argument("--message-days", type=int, default=None, help="Defaults to MESSAGE_RETENTION_DAYS.")
+    parser.add_argument("--batch-size", type=int, default=None, help="Defaults to ARCHIVE_BATCH_SIZE.")
+    args = parser.parse_args()
+    asyncio.run(main(args.notification_days, args.message_days, args.batch_size))
@@ -0,0 +1,106 @@
+"""
+Page through a mixed read/unread notification feed and check the keyset cursor.
+
+Compiles the page-2 predicate for both cursor states against the postgresql dialect, then,
+with --user-id, stages --unread unread and --read read notifications for that user inside a
+transaction, walks the whole feed --page-size rows at a time through
+get_notifications_for_user and checks that the pages are in feed order, never repeat a row
+and contain every staged notification. The transaction is rolled back afterwards.
+
+Usage:
+    python -m app.scripts.check_notification_feed
+    python -m app.scripts.check_notification_feed --user-id 1 --unread 7 --read 8 --page-size 4
+"""
+import argparse
+import asyncio
+import sys
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql
+from app.db.database import AsyncSessionLocal, engine
+from app.models.notification import Notification
+from app.services.notification import _after_feed_cursor, get_notifications_for_user
+from app.utils.logger import logger
+import app.db.base  # register every model with the mapper
+
+
+def check_cursor_predicate() -> bool:
+    ok = True
+    for is_read in (False, True):
+        try:
+            clause = _after_feed_cursor(is_read, datetime.utcnow(), 1)
+            clause.compile(dialect=postgresql.dialect())
+        except Exception as e:
+            ok = False
+            logger.error(f"Cursor predicate for is_read={is_read} does not compile: {e}")
+    return ok
+
+
+async def check_pages(user_id: int, unread: int, read: int, page_size: int) -> bool:
+    now = datetime.utcnow()
+    rows = [
+        {
+            "user_id": user_id,
+            "role": "user",
+            "message": f"feed check {index}",
+            "is_read": index >= unread,
+            # Repeat timestamps so the id tiebreak is exercised too.
+            "created_at": now - timedelta(seconds=index // 2),
+        }
+        for index in range(unread + read)
+    ]
+
+    async with AsyncSessionLocal() as db:
+        try:
+            result = await db.scalars(insert(Notification).returning(Notification.id), rows)
+            staged = set(result.all())
+
+            seen, pages, cursor = [], 0, None
+            while True:
+                page = await get_notifications_for_user(db, user_id, limit=page_size, cursor=cursor)
+                pages += 1
+                seen.extend(page["items"])
+                cursor = page["next_cursor"]
+                if not cursor:
+                    break
+        finally:
+            await db.rollback()
+
+    ok = True
+    ids = [notification.id for notification in seen]
+    expected = sorted(seen, key=lambda n: (n.is_read, -n.created_at.timestamp(), -n.id))
+    if len(ids) != len(set(ids)):
+        ok = False
+        logger.error("The same notification appeared on more than one page")
+    if ids != [notification.id for notification in expected]:
+        ok = False
+        logger.error("Pages are not in (is_read, created_at DESC, id DESC) order")
+    if not staged <= set(ids):
+        ok = False
+        logger.error(f"{len(staged - set(ids))} staged notifications never showed up")
+    if pages < 2:
+        ok = False
+        logger.error("The feed fit on one page; lower --page-size")
+
+    logger.info(f"Walked {len(ids)} notifications over {pages} pages of {page_size}")
+    return ok
+
+
+async def main(user_id: int | None, unread: int, read: int, page_size: int) -> bool:
+    ok = check_cursor_predicate()
+    if user_id is not None:
+        ok = await check_pages(user_id, unread, read, page_size) and ok
+    await engine.dispose()
+    if ok:
+        logger.info("Notification feed pagination check passed")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check keyset pagination of the notification feed.")
+    parser.add_argument("--user-id", type=int, default=None, help="Existing user to stage notifications for.")
+    parser.add_argument("--unread", type=int, default=7)
+    parser.add_argument("--read", type=int, default=8)
+    parser.add_argument("--page-size", type=int, default=4)
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(main(args.user_id, args.unread, args.read, args.page_size)) else 1)
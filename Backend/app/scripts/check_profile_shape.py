@@ -0,0 +1,58 @@
+"""
+Check that the cached profile serves the same /users/details payload as the ORM user.
+
+/users/details and /users/user-details declare response_model=UserBase but return the
+UserProfile snapshot from the profile cache. This loads a user, renders UserBase from the row
+and from a JSON round-trip of its profile (as the cache stores it) and reports any field that
+differs, plus any UserBase field UserProfile does not carry at all.
+
+Usage:
+    python -m app.scripts.check_profile_shape --user-id 1
+"""
+import argparse
+import asyncio
+import json
+import sys
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+from app.db.database import AsyncSessionLocal, engine
+from app.models.users import User
+from app.schemas.users import UserBase, UserProfile
+from app.services.users import serialize_profile
+from app.utils.logger import logger
+import app.db.base  # register every model with the mapper
+
+
+async def main(user_id: int) -> bool:
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(User).options(selectinload(User.seller)).where(User.id == user_id))
+        user = result.scalar_one_or_none()
+        if not user:
+            logger.error(f"User {user_id} not found")
+            return False
+        from_row = UserBase.model_validate(user).model_dump(mode="json")
+        cached = json.loads(json.dumps(serialize_profile(user), default=str))
+    await engine.dispose()
+
+    ok = True
+    missing = set(UserBase.model_fields) - set(UserProfile.model_fields)
+    if missing:
+        ok = False
+        logger.error(f"UserProfile is missing UserBase fields: {sorted(missing)}")
+
+    from_profile = UserBase.model_validate(cached).model_dump(mode="json")
+    for field in UserBase.model_fields:
+        if from_row.get(field) != from_profile.get(field):
+            ok = False
+            logger.error(f"{field}: row gives {from_row.get(field)!r}, cached profile gives {from_profile.get(field)!r}")
+
+    if ok:
+        logger.info(f"Profile for user {user_id} matches the UserBase payload field for field")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the cached profile with the ORM user for /users/details.")
+    parser.add_argument("--user-id", type=int, required=True)
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(main(args.user_id)) else 1)
@@ -0,0 +1,27 @@
+"""
+Rebuild the seller_stats table from orders and products.
+
+Usage:
+    python -m app.scripts.rebuild_seller_stats               # every seller
+    python -m app.scripts.rebuild_seller_stats --seller-id 7 # one seller
+"""
+import argparse
+import asyncio
+from app.db.database import AsyncSessionLocal, engine
+from app.services.seller_stats import rebuild_seller_stats
+from app.utils.logger import logger
+import app.db.base  # register every model with the mapper
+
+
+async def main(seller_id: int | None) -> None:
+    async with AsyncSessionLocal() as db:
+        rebuilt = await rebuild_seller_stats(db, seller_id)
+    await engine.dispose()
+    logger.info(f"seller_stats reconciliation finished: {rebuilt} rows written")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild seller_stats from the orders and products tables.")
+    parser.add_argument("--seller-id", type=int, default=None, help="Only rebuild this seller's row.")
+    args = parser.parse_args()
+    asyncio.run(main(args.seller_id))
@@ -0,0 +1,79 @@
+"""
+Hammer one SKU with concurrent stock takes and check that it never oversells.
+
+Sets the SKU's stock to --stock, runs --workers coroutines that each take --quantity units in
+their own session and transaction, then checks that the successful takes add up to exactly
+the starting stock and that stock ended at zero. The original stock is restored afterwards.
+
+Usage:
+    python -m app.scripts.stock_stress --product-id 1
+    python -m app.scripts.stock_stress --product-id 1 --variant-id 4 --workers 500 --stock 120
+"""
+import argparse
+import asyncio
+import sys
+from fastapi import HTTPException
+from sqlalchemy import select, update
+from app.db.database import AsyncSessionLocal, engine
+from app.models.products import Product, ProductVariant
+from app.services.stock import take_stock
+from app.utils.logger import logger
+import app.db.base  # register every model with the mapper
+
+
+async def _set_stock(model, row_id: int, stock: int) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(update(model).where(model.id == row_id).values(stock=stock))
+        await db.commit()
+
+
+async def _read_stock(model, row_id: int) -> int:
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(model.stock).where(model.id == row_id))
+        return result.scalar_one()
+
+
+async def _worker(product_id: int, variant_id: int | None, quantity: int) -> bool:
+    async with AsyncSessionLocal() as db:
+        try:
+            if variant_id:
+                await take_stock(db, {}, {variant_id: quantity})
+            else:
+                await take_stock(db, {product_id: quantity}, {})
+            await db.commit()
+            return True
+        except HTTPException:
+            await db.rollback()
+            return False
+
+
+async def main(product_id: int, variant_id: int | None, workers: int, stock: int, quantity: int) -> bool:
+    model, row_id = (ProductVariant, variant_id) if variant_id else (Product, product_id)
+    original = await _read_stock(model, row_id)
+    await _set_stock(model, row_id, stock)
+    try:
+        results = await asyncio.gather(*(_worker(product_id, variant_id, quantity) for _ in range(workers)))
+        remaining = await _read_stock(model, row_id)
+    finally:
+        await _set_stock(model, row_id, original)
+        await engine.dispose()
+
+    sold = sum(results) * quantity
+    expected = min(stock // quantity, workers) * quantity
+    logger.info(f"{workers} workers, {sum(results)} succeeded, sold {sold} of {stock}, {remaining} left")
+    ok = remaining >= 0 and sold + remaining == stock and sold == expected
+    if not ok:
+        logger.error(f"Stock check failed: sold {sold}, expected {expected}, remaining {remaining}")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent stock take stress check for one SKU.")
+    parser.add_argument("--product-id", type=int, required=True)
+    parser.add_argument("--variant-id", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=300)
+    parser.add_argument("--stock", type=int, default=100)
+    parser.add_argument("--quantity", type=int, default=1)
+    args = parser.parse_args()
+    ok = asyncio.run(main(args.product_id, args.variant_id, args.workers, args.stock, args.quantity))
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,86 @@
+"""
+Measure WebSocket delivery latency through ConnectionManager with many local connections.
+
+Opens --connections in-process sockets (two per user by default), makes --slow-ratio of them
+stall on every send, publishes --messages rounds to every user and reports p50/p99 delivery
+latency for the healthy sockets together with the manager's drop/disconnect counters.
+No network is involved; this exercises the queueing and writer tasks only.
+
+Usage:
+    python -m app.scripts.ws_broadcast_bench
+    python -m app.scripts.ws_broadcast_bench --connections 10000 --slow-ratio 0.05 --messages 20
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from app.dependencies.websocket import ConnectionManager, InMemoryBroker
+from app.utils.logger import logger
+
+
+class BenchSocket:
+    def __init__(self, send_delay: float, latencies: list):
+        self.send_delay = send_delay
+        self.latencies = latencies
+
+    async def accept(self):
+        pass
+
+    async def close(self, code: int = 1000):
+        pass
+
+    async def send_text(self, text: str):
+        if self.send_delay:
+            await asyncio.sleep(self.send_delay)
+        if text != "ping" and not self.send_delay:
+            self.latencies.append(time.perf_counter() - json.loads(text)["sent_at"])
+
+
+def _percentile(samples: list, percent: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * percent / 100))]
+
+
+async def main(connections: int, per_user: int, slow_ratio: float, slow_delay: float, messages: int) -> None:
+    manager = ConnectionManager("bench", InMemoryBroker())
+    latencies = []
+    users = connections // per_user
+    slow_every = int(1 / slow_ratio) if slow_ratio else 0
+
+    for index in range(connections):
+        delay = slow_delay if slow_every and index % slow_every == 0 else 0.0
+        await manager.connect(BenchSocket(delay, latencies), index % users)
+
+    started = time.perf_counter()
+    for _ in range(messages):
+        for user_id in range(users):
+            await manager.send_message({"type": "bench", "sent_at": time.perf_counter()}, user_id)
+        await asyncio.sleep(0)
+    publish_seconds = time.perf_counter() - started
+
+    expected = messages * (connections - (connections // slow_every if slow_every else 0))
+    while len(latencies) < expected and time.perf_counter() - started < 60:
+        await asyncio.sleep(0.01)
+    total_seconds = time.perf_counter() - started
+
+    for websocket in list(manager.clients):
+        manager.disconnect(websocket, manager.clients[websocket].user_id)
+
+    logger.info(
+        f"{connections} connections, {messages} rounds: published in {publish_seconds:.3f}s, "
+        f"delivered {len(latencies)}/{expected} in {total_seconds:.3f}s, "
+        f"p50 {statistics.median(latencies) * 1000:.2f}ms, p99 {_percentile(latencies, 99) * 1000:.2f}ms, "
+        f"stats {manager.stats}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="In-process WebSocket fan-out latency benchmark.")
+    parser.add_argument("--connections", type=int, default=10000)
+    parser.add_argument("--per-user", type=int, default=2)
+    parser.add_argument("--slow-ratio", type=float, default=0.01)
+    parser.add_argument("--slow-delay", type=float, default=0.5, help="Seconds each send to a slow socket takes.")
+    parser.add_argument("--messages", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.connections, args.per_user, args.slow_ratio, args.slow_delay, args.messages))
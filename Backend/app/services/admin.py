@@ -7,8 +7,10 @@ from app.models.users import User
 from app.models.category import ProductCategory, ServiceCategory
 from app.schemas.category import ProductCategoryCreate, ServiceCategoryCreate
 from app.schemas.users import UserBase
-from app.services.notification import create_new_notification
+from app.services.notification import add_notification, wake_notification_dispatcher
 from app.utils.logger import logger
+from app.utils.principal_cache import invalidate_principals, publish_token_version
+from app.services.users import bump_token_version
 
 
 async def add_product_category(db: AsyncSession, category: ProductCategoryCreate):
@@ -75,8 +77,12 @@ async def approve_seller(db: AsyncSession, seller_id: int):
 
         seller.is_verified = True
         user.is_seller = True
-        await create_new_notification(db, seller_id, "Congratulations! Your application to become a seller has been approved.", role="seller")
+        add_notification(db, seller_id, "Congratulations! Your application to become a seller has been approved.", role="seller")
+        token_version = await bump_token_version(db, user.id)
         await db.commit()
+        wake_notification_dispatcher()
+        await invalidate_principals(user.id)
+        await publish_token_version(user.id, token_version)
         await db.refresh(user)
         await db.refresh(seller)
         logger.info(f"Seller ID '{seller_id}' approved successfully")
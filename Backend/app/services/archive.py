@@ -0,0 +1,142 @@
+import gzip
+import json
+import os
+from datetime import datetime, timedelta
+from sqlalchemy import select, delete, exists
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.conversation import Conversation, Message, MessageImage
+from app.models.notification import Notification
+from app.utils.logger import logger
+
+
+class ArchiveWriter:
+    """Appends rows to a gzip-compressed JSON Lines file under ARCHIVE_DIR/<table>/."""
+
+    def __init__(self, table: str, run_id: str):
+        directory = os.path.join(settings.ARCHIVE_DIR, table)
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f"{table}-{run_id}.jsonl.gz")
+        self.rows = 0
+        self.raw_bytes = 0
+        self._file = None
+
+    def write(self, rows) -> None:
+        if not rows:
+            return
+        if self._file is None:
+            self._file = gzip.open(self.path, "at", encoding="utf-8")
+        for row in rows:
+            line = json.dumps(dict(row._mapping), default=str, separators=(",", ":")) + "\n"
+            self._file.write(line)
+            self.raw_bytes += len(line.encode())
+        # Rows must be on disk before the delete that follows is committed.
+        self._file.flush()
+        self.rows += len(rows)
+
+    def close(self) -> dict:
+        if self._file is not None:
+            self._file.close()
+        return {
+            "file": self.path if self.rows else None,
+            "rows": self.rows,
+            "raw_bytes": self.raw_bytes,
+            "compressed_bytes": os.path.getsize(self.path) if self.rows else 0,
+        }
+
+
+async def archive_notifications(db: AsyncSession, cutoff: datetime, batch_size: int, run_id: str) -> dict:
+    table = Notification.__table__
+    writer = ArchiveWriter("notifications", run_id)
+    try:
+        while True:
+            result = await db.execute(
+                select(table)
+                .where(table.c.created_at < cutoff)
+                .order_by(table.c.id)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            rows = result.all()
+            if not rows:
+                break
+            writer.write(rows)
+            await db.execute(delete(table).where(table.c.id.in_([row.id for row in rows])))
+            await db.commit()
+            if len(rows) < batch_size:
+                break
+    except Exception:
+        await db.rollback()
+        raise
+    finally:
+        report = writer.close()
+
+    logger.info(f"Archived {report['rows']} notifications older than {cutoff}")
+    return report
+
+
+async def archive_messages(db: AsyncSession, cutoff: datetime, batch_size: int, run_id: str) -> dict:
+    """
+    Archive messages older than `cutoff` together with their images. A conversation's last
+    message stays behind so the inbox preview keeps working.
+    """
+    messages = Message.__table__
+    images = MessageImage.__table__
+    message_writer = ArchiveWriter("messages", run_id)
+    image_writer = ArchiveWriter("message_images", run_id)
+    try:
+        while True:
+            result = await db.execute(
+                select(messages)
+                .where(
+                    messages.c.timestamp < cutoff,
+                    ~exists().where(Conversation.last_message_id == messages.c.id)
+                )
+                .order_by(messages.c.id)
+                .limit(batch_size)
+                .with_for_update(of=messages, skip_locked=True)
+            )
+            rows = result.all()
+            if not rows:
+                break
+            message_ids = [row.id for row in rows]
+
+            result = await db.execute(select(images).where(images.c.message_id.in_(message_ids)))
+            image_rows = result.all()
+
+            message_writer.write(rows)
+            image_writer.write(image_rows)
+            await db.execute(delete(images).where(images.c.message_id.in_(message_ids)))
+            await db.execute(delete(messages).where(messages.c.id.in_(message_ids)))
+            await db.commit()
+            if len(rows) < batch_size:
+                break
+    except Exception:
+        await db.rollback()
+        raise
+    finally:
+        message_report = message_writer.close()
+        image_report = image_writer.close()
+
+    logger.info(f"Archived {message_report['rows']} messages and {image_report['rows']} images older than {cutoff}")
+    return {"messages": message_report, "message_images": image_report}
+
+
+async def archive_old_rows(
+    db: AsyncSession,
+    notification_days: int | None = None,
+    message_days: int | None = None,
+    batch_size: int | None = None
+) -> dict:
+    """Move notifications and chat history past their retention period into cold storage."""
+    now = datetime.utcnow()
+    run_id = now.strftime("%Y%m%dT%H%M%S")
+    batch_size = batch_size or settings.ARCHIVE_BATCH_SIZE
+    notification_days = notification_days if notification_days is not None else settings.NOTIFICATION_RETENTION_DAYS
+    message_days = message_days if message_days is not None else settings.MESSAGE_RETENTION_DAYS
+
+    report = {
+        "notifications": await archive_notifications(db, now - timedelta(days=notification_days), batch_size, run_id),
+        **await archive_messages(db, now - timedelta(days=message_days), batch_size, run_id),
+    }
+    return report
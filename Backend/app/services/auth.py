@@ -1,16 +1,16 @@
 from app.core.config import settings
-from app.core.security import hash_password, verify_password, create_access_token, create_refresh_token, decode_token
+from app.core.security import hash_password_async, verify_password_async, create_access_token, create_refresh_token, decode_token
 from app.models.users import User
 from sqlalchemy.orm import selectinload
 from app.schemas.auth import VerifyEmailOTP, VerifyResetPasswordOTP, ForgotPasswordRequest
-from sqlalchemy import select
+from sqlalchemy import select, update
 from fastapi import HTTPException, status, Request
-from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.utils.email import send_otp_to_email
-from app.utils.cache import redis_client
+from app.services.otp import issue_otp, verify_otp, EMAIL_VERIFICATION, PASSWORD_RESET
 from fastapi.responses import JSONResponse
 from app.utils.logger import logger
+from app.utils.principal_cache import Principal, set_cached_principal, set_cached_profile
+from app.services.users import serialize_profile, get_user_profile
 
 
 async def create_admin_user(db: AsyncSession, admin_register_data):
@@ -25,7 +25,7 @@ async def create_admin_user(db: AsyncSession, admin_register_data):
                 detail="Email already registered"
             )
         
-        hashed_password = await run_in_threadpool(hash_password, admin_register_data.password)
+        hashed_password = await hash_password_async(admin_register_data.password)
 
         new_admin = User(
             username=admin_register_data.username,
@@ -60,9 +60,7 @@ async def send_email_verification(db: AsyncSession, user_email: str):
     try:
         
         logger.info(f"Sending OTP to email: {user_email}")
-        otp = await send_otp_to_email(user_email, purpose="Email Verification")
-
-        redis_client.setex(f"email_verification_otp:{user_email}", 300, otp)  # OTP valid for 5 minutes
+        await issue_otp(user_email, EMAIL_VERIFICATION)
         logger.info(f"OTP sent to email: {user_email}")
 
         return JSONResponse(
@@ -99,6 +97,9 @@ async def register_user(db: AsyncSession, user_register_data):
                 content={"message": "An OTP has been sent to your email for verification."}
             )
 
+        except HTTPException:
+            raise
+
         except Exception as e:
             logger.error(f"Error sending email verification during registration: {e}")
             raise HTTPException(
@@ -119,24 +120,12 @@ async def register_user(db: AsyncSession, user_register_data):
 
 async def verify_email_otp(db: AsyncSession, verify_data: VerifyEmailOTP):
     try:
-        stored_otp = redis_client.get(f"email_verification_otp:{verify_data.email}")
         logger.info(f"Verifying OTP for email: {verify_data.email}")
-        if not stored_otp:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="OTP has expired or is invalid"
-            )
-        
-        if stored_otp != verify_data.otp:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid OTP"
-            )
-        
-        redis_client.delete(f"email_verification_otp:{verify_data.email}")
+        # Hash before consuming the OTP so a busy hashing pool (503) leaves it usable for a retry.
+        hashed_password = await hash_password_async(verify_data.password)
+        await verify_otp(verify_data.email, EMAIL_VERIFICATION, verify_data.otp)
         logger.info(f"OTP verified and deleted for email: {verify_data.email}")
         try:
-            hashed_password = await run_in_threadpool(hash_password, verify_data.password)
             new_user = User(
                 username=verify_data.username,
                 email=verify_data.email,
@@ -183,16 +172,22 @@ async def login_user(db: AsyncSession, user_login_data):
                 detail="Account does not exist"
             )
 
-        if not await run_in_threadpool(verify_password, user_login_data.password, user.hashed_password):
+        valid, new_hash = await verify_password_async(user_login_data.password, user.hashed_password)
+        if not valid:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid email or password"
             )
-        
-        result = await db.execute(select(User).options(selectinload(User.seller)).where(User.id == user.id))
-        user = result.scalar_one_or_none()
 
-        access_token = create_access_token(data={"user_id": user.id})
+        if new_hash:
+            # Stored hash used a different bcrypt cost than BCRYPT_ROUNDS; upgrade it now that we have the password.
+            await db.execute(update(User).where(User.id == user.id).values(hashed_password=new_hash))
+            await db.commit()
+            logger.info(f"Rehashed password for user_id {user.id} with {settings.BCRYPT_ROUNDS} rounds")
+
+        principal = Principal.from_user(user)
+        profile = serialize_profile(user)
+        access_token = create_access_token(data={"user_id": user.id}, principal=principal)
         refresh_token = create_refresh_token(data={"user_id": user.id})
 
         response = JSONResponse(
@@ -201,36 +196,14 @@ async def login_user(db: AsyncSession, user_login_data):
                 "success": True,
                 "message": "Login successful",
                 "access_token": access_token,
-                "user": {
-                    "id": user.id,
-                    "username": user.username,
-                    "email": user.email,
-                    "first_name": user.first_name,
-                    "last_name": user.last_name,
-                    "middle_name": user.middle_name,
-                    "address": user.address,
-                    "contact_number": user.contact_number,
-                    "is_admin": user.is_admin,
-                    "is_seller": user.is_seller,
-                    "seller": {
-                        "id": user.seller.id if user.seller else None,
-                        "business_name": user.seller.business_name if user.seller else None,
-                        "is_verified": user.seller.is_verified if user.seller else None,
-                        "business_address": user.seller.business_address if user.seller else None,
-                        "business_contact": user.seller.business_contact if user.seller else None,
-                        "display_name": user.seller.display_name if user.seller else None,
-                        "owner_address": user.seller.owner_address if user.seller else None,
-                        "followers": user.seller.followers if user.seller else None,
-                        "is_verified": user.seller.is_verified if user.seller else None,
-                        "ratings": user.seller.ratings if user.seller else None,
-                        "is_seller_mode": user.seller.is_seller_mode if user.seller else None
-                    } if user.seller else None
-                }
+                "user": profile
             }
         )
-        logger.info(f"User logged in successfully: {user.email}")
 
         await set_cookies(response, access_token, refresh_token)
+        # The client's next requests resolve the user and profile without touching the database.
+        await set_cached_principal(principal)
+        await set_cached_profile(profile)
         
         logger.info(f"User logged in successfully: {user.email}")
 
@@ -256,18 +229,7 @@ async def get_current_user_by_token(db: AsyncSession, token: str):
             if not user_id:
                 raise HTTPException(status_code=401, detail="Invalid token payload")
 
-            result = await db.execute(
-                select(User).options(selectinload(User.seller)).where(User.id == user_id)
-            )
-            
-            user = result.scalar_one_or_none()
-    
-            if not user:
-                raise HTTPException(status_code=404, detail="User not found")
-            logger.info(f"user.seller: {user.seller}")
-            logger.info(f"Current user retrieved successfully: {user.email}")
-            logger.info(user.seller.business_name)
-            return user
+            return await get_user_profile(db, user_id)
     
     except HTTPException:
         raise
@@ -289,8 +251,7 @@ async def forgot_password(db: AsyncSession, forgot_password_data: ForgotPassword
                 detail="Email not found"
             )
         
-        otp = await send_otp_to_email(forgot_password_data.email, purpose="Reset Password")
-        redis_client.setex(f"password_reset_otp:{forgot_password_data.email}", 300, otp)  # OTP valid for 5 minutes
+        await issue_otp(forgot_password_data.email, PASSWORD_RESET)
         logger.info(f"Password reset OTP sent to email: {forgot_password_data.email}")
 
         return JSONResponse(
@@ -316,19 +277,7 @@ async def verify_password_reset_otp(db: AsyncSession, verify_data: VerifyResetPa
                 detail="OTP is required"
             )
         
-        if verify_data.otp != redis_client.get(f"password_reset_otp:{verify_data.email}"):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid OTP"
-            )
-        
-        if not redis_client.get(f"password_reset_otp:{verify_data.email}"):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="OTP has expired or is invalid"
-            )
-        
-        redis_client.delete(f"password_reset_otp:{verify_data.email}")
+        await verify_otp(verify_data.email, PASSWORD_RESET, verify_data.otp)
         logger.info(f"Password reset OTP verified and deleted for email: {verify_data.email}")
         return JSONResponse(
             status_code=status.HTTP_200_OK,
@@ -357,7 +306,7 @@ async def reset_password(db: AsyncSession, email: str, new_password: str):
                 detail="Email not found"
             )
         
-        hashed_password = await run_in_threadpool(hash_password, new_password)
+        hashed_password = await hash_password_async(new_password)
         user.hashed_password = hashed_password
         db.add(user)
         await db.commit()
@@ -399,7 +348,22 @@ async def set_cookies(response: JSONResponse, access_token: str, refresh_token:
         expires=7 * 24 * 60 * 60 # 7 days in seconds
     )
 
-async def token_refresh(request: Request):
+async def _refresh_principal(db: AsyncSession, user_id: int) -> Principal:
+    """
+    Current role claims for a refreshed access token. Always read from the database: after a
+    role change other workers' local principal caches may still hold the old token version,
+    and a token minted from them would be rejected as revoked straight away.
+    """
+    result = await db.execute(select(User).options(selectinload(User.seller)).where(User.id == user_id))
+    user = result.scalar_one_or_none()
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+
+    principal = Principal.from_user(user)
+    await set_cached_principal(principal)
+    return principal
+
+async def token_refresh(db: AsyncSession, request: Request):
     refresh_token = request.cookies.get("refresh_token")
     if not refresh_token:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="No refresh token")
@@ -417,7 +381,7 @@ async def token_refresh(request: Request):
             detail="Invalid refresh token payload"
         )
     
-    new_access_token = create_access_token({"user_id": user_id})
+    new_access_token = create_access_token({"user_id": user_id}, principal=await _refresh_principal(db, user_id))
 
     response = JSONResponse({
         "access_token": new_access_token,
@@ -434,7 +398,7 @@ async def token_refresh(request: Request):
     
     return response
 
-async def refresh_token_for_mobile(token: str):
+async def refresh_token_for_mobile(db: AsyncSession, token: str):
     payload = decode_token(token, settings.SECRET_KEY, settings.ALGORITHM)
     
     if not payload or payload.get("type") != "refresh":
@@ -448,7 +412,7 @@ async def refresh_token_for_mobile(token: str):
             detail="Invalid refresh token payload"
         )
     
-    new_access_token = create_access_token({"user_id": user_id})
+    new_access_token = create_access_token({"user_id": user_id}, principal=await _refresh_principal(db, user_id))
 
     return {
         "access_token": new_access_token,
@@ -6,6 +6,8 @@ from app.models.products import Product, ProductVariant
 from app.schemas.cart import CartItemBase
 from sqlalchemy.future import select
 from app.utils.logger import logger
+from app.utils.product_cache import invalidate_products
+from app.services.stock import hold_cart_item, release_cart_items, apply_stock_gate, revert_stock_gate
 
 async def get_cart_by_user(db: AsyncSession, user_id: int) -> Cart:
 
@@ -87,19 +89,17 @@ async def add_item_to_cart(db: AsyncSession, user_id: int, item_data: CartItemBa
         existing_item = result.scalar_one_or_none()
 
         if existing_item:
-            if item_data.quantity + existing_item.quantity > (variant.stock if variant else product.stock):
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Insufficient stock for the requested quantity."
-                )
             new_quantity = existing_item.quantity + item_data.quantity
+            await hold_cart_item(db, existing_item, new_quantity)
             existing_item.quantity = new_quantity
             existing_item.price = price
             existing_item.subtotal = price * new_quantity
 
             db.add(existing_item)
             await db.commit()
+            await apply_stock_gate(db)
             await db.refresh(existing_item)
+            await invalidate_products(existing_item.product_id)
 
             return JSONResponse(
                 status_code=200,
@@ -128,8 +128,12 @@ async def add_item_to_cart(db: AsyncSession, user_id: int, item_data: CartItemBa
         )
 
         db.add(cart_item)
+        await db.flush()
+        await hold_cart_item(db, cart_item, item_data.quantity)
         await db.commit()
+        await apply_stock_gate(db)
         await db.refresh(cart_item)
+        await invalidate_products(cart_item.product_id)
 
         return JSONResponse(
             status_code=201,
@@ -147,10 +151,13 @@ async def add_item_to_cart(db: AsyncSession, user_id: int, item_data: CartItemBa
         )
 
     except HTTPException:
+        await db.rollback()
+        await revert_stock_gate(db)
         raise
 
     except Exception as e:
         await db.rollback()
+        await revert_stock_gate(db)
         logger.error(f"Error adding item to cart: {e}")
         raise HTTPException(
             status_code=500, detail="Failed to add item to cart."
@@ -169,8 +176,11 @@ async def remove_item_from_cart(db: AsyncSession, cart_item_id: int) -> None:
             )
         logger.info(f"Removing item from cart: {cart_item}")
         
+        product_ids = await release_cart_items(db, [cart_item.id])
         await db.delete(cart_item)
         await db.commit()
+        await apply_stock_gate(db)
+        await invalidate_products(*product_ids)
         logger.info(f"Removed item from cart: {cart_item}")
 
         return JSONResponse(
@@ -195,10 +205,13 @@ async def clear_cart(db: AsyncSession, user_id: int) -> None:
         )
         items = result.scalars().all()
         
+        product_ids = await release_cart_items(db, [item.id for item in items])
         for item in items:
             await db.delete(item)
         
         await db.commit()
+        await apply_stock_gate(db)
+        await invalidate_products(*product_ids)
         
         return JSONResponse(
             status_code=status.HTTP_200_OK,
@@ -226,28 +239,15 @@ async def edit_cart_item(db: AsyncSession, cart_item_id: int, quantity: int) ->
                 detail="Cart item not found."
             )
         
-        product_result = await db.execute(
-            select(Product).where(Product.id == cart_item.product_id)
-        )
-        product = product_result.scalar_one_or_none()
-        if not product:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Associated product not found."
-            )
-        
-        if quantity > product.stock:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Insufficient stock for the requested quantity."
-            )
-        
+        await hold_cart_item(db, cart_item, quantity)
         cart_item.quantity = quantity
         cart_item.subtotal = cart_item.price * quantity
         
         db.add(cart_item)
         await db.commit()
+        await apply_stock_gate(db)
         await db.refresh(cart_item)
+        await invalidate_products(cart_item.product_id)
         
         return JSONResponse(
             status_code=status.HTTP_200_OK,
@@ -262,10 +262,13 @@ async def edit_cart_item(db: AsyncSession, cart_item_id: int, quantity: int) ->
         )
     
     except HTTPException:
+        await db.rollback()
+        await revert_stock_gate(db)
         raise
 
     except Exception as e:
         await db.rollback()
+        await revert_stock_gate(db)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to update cart item."
@@ -1,13 +1,22 @@
+import asyncio
+import io
 from fastapi import HTTPException, status, UploadFile
 from app.dependencies.websocket import chat_manager
-from sqlalchemy import or_, select
+from sqlalchemy import or_, select, tuple_, update, insert, case, func
 from sqlalchemy.orm import selectinload
 from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.conversation import Conversation, MessageImage, Message
+from app.models.users import User
 from app.utils.logger import logger
+from app.db.database import AsyncSessionLocal
 from app.utils.cloudinary import upload_image_to_cloudinary
 from app.schemas.chat import MessageCreate
+from app.utils.pagination import encode_cursor, decode_cursor
+from datetime import datetime
+
+# Keeps background image uploads referenced until they finish.
+_background_uploads: set = set()
 
 async def get_conversations_for_user(db: AsyncSession, user_id: int) -> List[Conversation]:
     try:
@@ -33,19 +42,157 @@ async def get_conversations_for_user(db: AsyncSession, user_id: int) -> List[Con
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to fetch conversations for the user."
         ) from e
-async def get_messages_for_conversation(db: AsyncSession, conversation_id: int) -> List[Message]:
+async def get_inbox(db: AsyncSession, user_id: int, limit: int = 20, cursor: Optional[str] = None):
+    """
+    The user's conversations, most recently active first, each with the other participant,
+    the last message and the user's unread count, in a single query over the denormalized
+    conversation columns.
+    """
     try:
+        is_sender = Conversation.sender_id == user_id
+        counterpart_id = case((is_sender, Conversation.receiver_id), else_=Conversation.sender_id)
+        unread_count = case((is_sender, Conversation.sender_unread_count), else_=Conversation.receiver_unread_count)
+
+        query = (
+            select(
+                Conversation.id,
+                Conversation.last_message_at,
+                counterpart_id.label("counterpart_id"),
+                User.username.label("counterpart_username"),
+                unread_count.label("unread_count"),
+                Message.id.label("last_message_id"),
+                Message.message.label("last_message"),
+                Message.sender_id.label("last_message_sender_id"),
+                Message.timestamp.label("last_message_timestamp"),
+            )
+            .outerjoin(User, User.id == counterpart_id)
+            .outerjoin(Message, Message.id == Conversation.last_message_id)
+            .where(or_(Conversation.sender_id == user_id, Conversation.receiver_id == user_id))
+        )
+
+        last_seen = decode_cursor(cursor, 2)
+        if last_seen:
+            last_seen = _message_keyset(last_seen)
+            query = query.where(tuple_(Conversation.last_message_at, Conversation.id) < tuple_(*last_seen))
+
         result = await db.execute(
+            query.order_by(Conversation.last_message_at.desc(), Conversation.id.desc()).limit(limit + 1)
+        )
+        rows = result.all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].last_message_at.isoformat(), rows[-1].id)
+
+        logger.info(f"Fetched inbox of {len(rows)} conversations for user {user_id}")
+        return {
+            "items": [
+                {
+                    "conversation_id": row.id,
+                    "counterpart_id": row.counterpart_id,
+                    "counterpart_username": row.counterpart_username,
+                    "unread_count": row.unread_count,
+                    "last_message_at": row.last_message_at,
+                    "last_message": {
+                        "id": row.last_message_id,
+                        "message": row.last_message,
+                        "sender_id": row.last_message_sender_id,
+                        "timestamp": row.last_message_timestamp,
+                    } if row.last_message_id else None,
+                }
+                for row in rows
+            ],
+            "next_cursor": next_cursor
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching inbox for user {user_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to fetch the inbox."
+        ) from e
+
+
+def _message_keyset(values: list) -> tuple:
+    try:
+        return datetime.fromisoformat(values[0]), int(values[1])
+    except (TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor."
+        )
+
+
+async def get_messages_for_conversation(
+    db: AsyncSession,
+    conversation_id: int,
+    limit: int = 50,
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    since_id: Optional[int] = None
+):
+    """
+    Page through a conversation on (timestamp, id). With no cursor the newest `limit` messages
+    are returned; `before` walks back through older history and `after` (or `since_id`, the
+    last message the client has) returns only what came later. Items are always oldest first.
+    """
+    try:
+        if sum(option is not None for option in (before, after, since_id)) > 1:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Use only one of before, after or since_id."
+            )
+
+        keyset = tuple_(Message.timestamp, Message.id)
+        query = (
             select(Message)
             .options(selectinload(Message.images))
             .where(Message.conversation_id == conversation_id)
-            .order_by(Message.timestamp.asc())
         )
-        messages = result.scalars().all()
+
+        newer_than = _message_keyset(decode_cursor(after, 2)) if after else None
+        if since_id is not None:
+            result = await db.execute(
+                select(Message.timestamp, Message.id)
+                .where(Message.id == since_id, Message.conversation_id == conversation_id)
+            )
+            newer_than = result.one_or_none()
+            if newer_than is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Message with ID {since_id} not found in this conversation."
+                )
+
+        # Fetch one extra row to know whether more messages exist in the direction of travel.
+        if newer_than is not None:
+            result = await db.execute(
+                query.where(keyset > tuple_(*newer_than))
+                .order_by(Message.timestamp.asc(), Message.id.asc())
+                .limit(limit + 1)
+            )
+            messages = result.scalars().all()
+            has_more = len(messages) > limit
+            messages = messages[:limit]
+        else:
+            if before:
+                query = query.where(keyset < tuple_(*_message_keyset(decode_cursor(before, 2))))
+            result = await db.execute(
+                query.order_by(Message.timestamp.desc(), Message.id.desc()).limit(limit + 1)
+            )
+            messages = result.scalars().all()
+            has_more = len(messages) > limit
+            messages = list(reversed(messages[:limit]))
+
         logger.info(f"Fetched {len(messages)} messages for conversation {conversation_id}")
-        if not messages:
-            return []
-        return messages
+        return {
+            "items": messages,
+            "has_more": has_more,
+            "before_cursor": encode_cursor(messages[0].timestamp.isoformat(), messages[0].id) if messages else None,
+            "after_cursor": encode_cursor(messages[-1].timestamp.isoformat(), messages[-1].id) if messages else after,
+        }
     
     except HTTPException:
         raise
@@ -92,42 +239,90 @@ async def create_a_conversation(db: AsyncSession, sender_id: int, receiver_id: i
             detail="Failed to create conversation."
         ) from e
     
-async def send_new_message(db: AsyncSession, message_data: MessageCreate, sender_id: int, images: Optional[List[UploadFile]] = None, conversation_id: Optional[int] = None) -> Message:
+async def _record_last_message(db: AsyncSession, conversation: Conversation, message: Message) -> None:
+    """Point the conversation at `message` and bump the other participant's unread count."""
+    unread_column = "receiver_unread_count" if message.sender_id == conversation.sender_id else "sender_unread_count"
+    await db.execute(
+        update(Conversation)
+        .where(Conversation.id == conversation.id)
+        .values(
+            last_message_id=func.greatest(func.coalesce(Conversation.last_message_id, 0), message.id),
+            last_message_at=func.greatest(Conversation.last_message_at, message.timestamp),
+            **{unread_column: getattr(Conversation, unread_column) + 1}
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def _detach_uploads(images: List[UploadFile]) -> List[UploadFile]:
+    """Copy uploads into memory; the request's spooled temp files are closed once the response is sent."""
+    detached = []
+    for image in images:
+        content = await image.read()
+        if content:
+            detached.append(UploadFile(file=io.BytesIO(content), filename=image.filename, size=len(content)))
+    return detached
+
+
+async def _attach_message_images(message_id: int, conversation_id: int, participant_ids: List[int], images: List[UploadFile]) -> None:
+    """
+    Upload a message's images concurrently, store them and announce them with an images_ready
+    event. If nothing could be stored, participants get an images_failed event instead so
+    clients can leave the pending state.
+    """
+    event = {"message_id": message_id, "conversation_id": conversation_id}
     try:
-        result = await db.execute(select(Conversation).where(Conversation.id == conversation_id))
-        conversation = result.scalar_one_or_none()
+        upload_results = await upload_image_to_cloudinary(images, folder="chat_images")
+        if not upload_results:
+            raise ValueError("no images were uploaded")
+
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                insert(MessageImage),
+                [{"message_id": message_id, "image_url": upload_result["secure_url"]} for upload_result in upload_results]
+            )
+            await db.commit()
+
+    except Exception as e:
+        logger.error(f"Error attaching images to message {message_id}: {e}")
+        event.update({"type": "images_failed", "images": [], "error": "Image upload failed."})
+        for participant_id in participant_ids:
+            await chat_manager.send_message(event, participant_id)
+        return
+
+    event.update({"type": "images_ready", "images": [upload_result["secure_url"] for upload_result in upload_results]})
+    for participant_id in participant_ids:
+        await chat_manager.send_message(event, participant_id)
+    logger.info(f"Attached {len(upload_results)} images to message {message_id}")
+
+
+async def send_new_message(db: AsyncSession, message_data: MessageCreate, sender_id: int, images: Optional[List[UploadFile]] = None, conversation_id: Optional[int] = None) -> dict:
+    """
+    Insert the message and push it right away. Images are uploaded in the background and
+    delivered to both participants as an "images_ready" event once stored, or an
+    "images_failed" event if the upload or insert fails.
+    """
+    try:
+        conversation = None
+        if conversation_id is not None:
+            result = await db.execute(select(Conversation).where(Conversation.id == conversation_id))
+            conversation = result.scalar_one_or_none()
         if not conversation:
             conversation = await create_a_conversation(db, sender_id, message_data.receiver_id)
-        
+
+        pending_images = await _detach_uploads(images) if images else []
+
         new_message = Message(
             conversation_id=conversation.id,
             sender_id=sender_id,
             message=message_data.message,
-            sender_type=message_data.sender_type
+            sender_type=message_data.sender_type,
+            is_read=False
         )
         db.add(new_message)
+        await db.flush()
+        await _record_last_message(db, conversation, new_message)
         await db.commit()
-        await db.refresh(new_message)
-
-        if images:
-            for image in images:
-                image_url = await upload_image_to_cloudinary([image], folder="chat_images")
-                for url in image_url:
-                    message_image = MessageImage(
-                        message_id=new_message.id,
-                        image_url=url["secure_url"]
-                    )
-                    db.add(message_image)
-                    await db.flush()
-            await db.commit()   
-        await db.refresh(new_message)
-
-        result = await db.execute(
-            select(Message)
-            .options(selectinload(Message.images))
-            .where(Message.id == new_message.id)
-        )
-        new_message = result.scalar_one_or_none()
 
         new_message_data = {
             "id": new_message.id,
@@ -136,13 +331,21 @@ async def send_new_message(db: AsyncSession, message_data: MessageCreate, sender
             "message": new_message.message,
             "timestamp": str(new_message.timestamp),
             "sender_type": new_message.sender_type,
-            "images": [image.image_url for image in new_message.images]
+            "images": [],
+            "images_pending": bool(pending_images)
         }
 
-
         logger.info(f"Sent new message {new_message.id} in conversation {conversation.id}")
         await chat_manager.send_message(new_message_data, message_data.receiver_id)
-        return new_message
+
+        if pending_images:
+            task = asyncio.create_task(_attach_message_images(
+                new_message.id, conversation.id, [message_data.receiver_id, sender_id], pending_images
+            ))
+            _background_uploads.add(task)
+            task.add_done_callback(_background_uploads.discard)
+
+        return new_message_data
     
     except HTTPException: 
         raise
@@ -154,4 +357,73 @@ async def send_new_message(db: AsyncSession, message_data: MessageCreate, sender
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to send message."
         ) from e
-    
+
+
+async def mark_messages_as_read(db: AsyncSession, conversation_id: int, user_id: int, up_to_message_id: int) -> dict:
+    """
+    Mark every message the other participant sent up to `up_to_message_id` as read, reset the
+    reader's unread counter from what is left, and push the change to both participants.
+    """
+    try:
+        result = await db.execute(select(Conversation).where(Conversation.id == conversation_id))
+        conversation = result.scalar_one_or_none()
+        if not conversation:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Conversation not found."
+            )
+        if user_id not in (conversation.sender_id, conversation.receiver_id):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You are not part of this conversation."
+            )
+
+        from_other = (
+            Message.conversation_id == conversation_id,
+            Message.sender_id != user_id,
+            Message.is_read == False,
+        )
+        result = await db.execute(
+            update(Message)
+            .where(*from_other, Message.id <= up_to_message_id)
+            .values(is_read=True)
+            .returning(Message.id)
+            .execution_options(synchronize_session=False)
+        )
+        marked = len(result.scalars().all())
+
+        unread_column = "sender_unread_count" if user_id == conversation.sender_id else "receiver_unread_count"
+        result = await db.execute(
+            update(Conversation)
+            .where(Conversation.id == conversation_id)
+            .values(**{unread_column: select(func.count(Message.id)).where(*from_other).scalar_subquery()})
+            .returning(getattr(Conversation, unread_column))
+            .execution_options(synchronize_session=False)
+        )
+        unread = result.scalar_one()
+        await db.commit()
+
+        other_id = conversation.receiver_id if user_id == conversation.sender_id else conversation.sender_id
+        event = {
+            "type": "messages_read",
+            "conversation_id": conversation_id,
+            "reader_id": user_id,
+            "up_to_message_id": up_to_message_id,
+        }
+        await chat_manager.send_message({**event, "unread_count": unread}, user_id)
+        if marked:
+            await chat_manager.send_message(event, other_id)
+
+        logger.info(f"Marked {marked} messages as read in conversation {conversation_id} for user {user_id}")
+        return {"marked": marked, "unread_count": unread}
+
+    except HTTPException:
+        raise
+
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Error marking messages as read in conversation {conversation_id} for user {user_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to mark messages as read."
+        ) from e
@@ -1,32 +1,53 @@
+import asyncio
+from contextlib import suppress
 from fastapi import HTTPException, status
-from sqlalchemy import or_, select
-from typing import List
+from sqlalchemy import or_, and_, select, insert, delete, update, func, tuple_, union_all
+from sqlalchemy.orm import aliased
+from typing import List, Optional
+from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.models.notification import Notification
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal
+from app.models.notification import Notification, NotificationOutbox
 from app.dependencies.websocket import notification_manager
 from app.models.users import User
 from app.utils.logger import logger
+from app.utils.pagination import encode_cursor, decode_cursor
 
+FEED_ORDER = (Notification.is_read.asc(), Notification.created_at.desc(), Notification.id.desc())
 
-async def create_new_notification(db: AsyncSession, target_id: int, message: str, role: str) -> Notification:
-    """Create a new notification for a user."""
-    try:
-        if role == "seller":
-            notification = Notification(
-                seller_id=target_id,
-                message=message,
-                role=role
-            )
-        else:
-            notification = Notification(
-                user_id=target_id,
-                message=message,
-                role=role
-            )
-        db.add(notification)
-        await db.commit()
-        await db.refresh(notification)
 
+_dispatch_wakeup = asyncio.Event()
+
+
+def add_notification(db: AsyncSession, target_id: int, message: str, role: str) -> NotificationOutbox:
+    """
+    Stage a notification in the caller's transaction. It is written to the outbox, so it is
+    only delivered if the caller commits; call wake_notification_dispatcher() after commit.
+    """
+    if role == "seller":
+        entry = NotificationOutbox(
+            seller_id=target_id,
+            message=message,
+            role=role
+        )
+    else:
+        entry = NotificationOutbox(
+            user_id=target_id,
+            message=message,
+            role=role
+        )
+    db.add(entry)
+    return entry
+
+
+def wake_notification_dispatcher() -> None:
+    """Let this worker's dispatcher pick up new outbox rows now instead of on its next poll."""
+    _dispatch_wakeup.set()
+
+
+async def push_notifications(notifications: List[Notification]) -> None:
+    for notification in notifications:
         notification_data = {
             "id": notification.id,
             "message": notification.message,
@@ -34,39 +55,149 @@ async def create_new_notification(db: AsyncSession, target_id: int, message: str
             "created_at": str(notification.created_at),
             "role": notification.role
         }
+        target_id = notification.seller_id if notification.role == "seller" else notification.user_id
+        try:
+            await notification_manager.send_message(notification_data, target_id)
+        except Exception as e:
+            logger.warning(f"Failed to push notification {notification.id} to {target_id}: {e}")
 
-        await notification_manager.send_message(notification_data, target_id)
 
-        logger.info(f"Notification created for user {target_id}: {message}")
-        return notification
-    
-    except HTTPException:
-        raise
-    
-    except Exception as e:
-        await db.rollback()
-        logger.exception(f"Error creating notification for user {target_id}: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Internal server error"
+async def dispatch_outbox(db: AsyncSession, batch_size: int) -> int:
+    """
+    Move one batch of outbox rows into `notifications` and push them. Rows are claimed with
+    SKIP LOCKED so several workers can dispatch at once; a crash before commit leaves them in
+    the outbox for the next pass.
+    """
+    try:
+        result = await db.execute(
+            select(NotificationOutbox)
+            .order_by(NotificationOutbox.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
         )
-    
-async def get_notifications_for_user(db: AsyncSession, user_id: int, seller_id: int | None = None) -> List[Notification]:
+        entries = result.scalars().all()
+        if not entries:
+            await db.rollback()
+            return 0
+
+        result = await db.scalars(
+            insert(Notification).returning(Notification, sort_by_parameter_order=True),
+            [
+                {
+                    "user_id": entry.user_id,
+                    "seller_id": entry.seller_id,
+                    "role": entry.role,
+                    "message": entry.message,
+                    "is_read": False,
+                    "created_at": entry.created_at,
+                }
+                for entry in entries
+            ]
+        )
+        notifications = result.all()
+        await db.execute(delete(NotificationOutbox).where(NotificationOutbox.id.in_([entry.id for entry in entries])))
+        await db.commit()
+
+    except Exception:
+        await db.rollback()
+        raise
+
+    await push_notifications(notifications)
+    logger.info(f"Dispatched {len(notifications)} notifications from the outbox")
+    return len(notifications)
+
+
+async def run_notification_dispatcher() -> None:
+    """Background loop started from the app lifespan."""
+    batch_size = settings.NOTIFICATION_DISPATCH_BATCH_SIZE
+    while True:
+        _dispatch_wakeup.clear()
+        try:
+            async with AsyncSessionLocal() as db:
+                while await dispatch_outbox(db, batch_size) == batch_size:
+                    pass
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Notification dispatch failed: {e}")
+
+        with suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(_dispatch_wakeup.wait(), settings.NOTIFICATION_DISPATCH_INTERVAL_SECONDS)
+
+
+def _after_feed_cursor(is_read: bool, created_at: datetime, notification_id: int):
+    """
+    Rows that come after (is_read, created_at, id) in FEED_ORDER. Booleans can't be compared
+    with < or > in SQLAlchemy, so the unread and read halves of the feed are spelled out.
+    is_read is NOT NULL, so = true/false matches IS TRUE/FALSE and stays usable by the feed indexes.
+    """
+    older = tuple_(Notification.created_at, Notification.id) < tuple_(created_at, notification_id)
+    if is_read:
+        return and_(Notification.is_read == True, older)
+    return or_(
+        Notification.is_read == True,
+        and_(Notification.is_read == False, older)
+    )
+
+
+async def get_notifications_for_user(
+    db: AsyncSession,
+    user_id: int,
+    seller_id: int | None = None,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    unread_only: bool = False
+):
+    """
+    Unread notifications first, then newest first, keyset-paginated on (is_read, created_at, id).
+    Each scope (user, seller) is read from its own feed index and the two pages are merged,
+    so a page costs the same no matter how many notifications have piled up.
+    """
     try:
-        filters = [
-            Notification.user_id == user_id
-        ]
+        last_seen = decode_cursor(cursor, 3)
+        if last_seen:
+            try:
+                last_seen = (bool(last_seen[0]), datetime.fromisoformat(last_seen[1]), int(last_seen[2]))
+            except (TypeError, ValueError):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Invalid pagination cursor."
+                )
+
+        def feed(scope_filter):
+            query = select(Notification).where(scope_filter)
+            if unread_only:
+                query = query.where(Notification.is_read == False)
+            if last_seen:
+                query = query.where(_after_feed_cursor(*last_seen))
+            return query.order_by(*FEED_ORDER).limit(limit + 1)
 
+        scopes = [Notification.user_id == user_id]
         if seller_id:
-            filters.append(Notification.seller_id == seller_id)
+            scopes.append(Notification.seller_id == seller_id)
 
-        result = await db.execute(
-            select(Notification)
-            .where(or_(*filters))
-            .order_by(Notification.created_at.desc())
-        )
+        if len(scopes) == 1:
+            query = feed(scopes[0])
+        else:
+            merged = union_all(*(feed(scope) for scope in scopes)).subquery()
+            feed_rows = aliased(Notification, merged)
+            query = select(feed_rows).order_by(
+                feed_rows.is_read.asc(), feed_rows.created_at.desc(), feed_rows.id.desc()
+            ).limit(limit + 1)
+
+        result = await db.execute(query)
+        notifications = result.scalars().all()
+
+        next_cursor = None
+        if len(notifications) > limit:
+            notifications = notifications[:limit]
+            last = notifications[-1]
+            next_cursor = encode_cursor(last.is_read, last.created_at.isoformat(), last.id)
 
-        return result.scalars().all()
+        return {
+            "items": notifications,
+            "next_cursor": next_cursor
+        }
     
     except HTTPException:
         raise
@@ -78,10 +209,51 @@ async def get_notifications_for_user(db: AsyncSession, user_id: int, seller_id:
             detail="Internal server error"
         )
     
-async def mark_notification_as_read(db: AsyncSession, notification_id: int, user_id: int) -> Notification:
+def _scope_filter(user_id: int, seller_id: int | None, scope: str):
+    if scope == "user":
+        return Notification.user_id == user_id
+    if scope == "seller":
+        if not seller_id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Only sellers have seller notifications."
+            )
+        return Notification.seller_id == seller_id
+    if scope == "all":
+        return or_(Notification.user_id == user_id, Notification.seller_id == seller_id) if seller_id else Notification.user_id == user_id
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Scope must be one of: user, seller, all."
+    )
+
+
+async def count_unread_notifications(db: AsyncSession, user_id: int, seller_id: int | None = None) -> int:
+    result = await db.execute(
+        select(func.count(Notification.id))
+        .where(_scope_filter(user_id, seller_id, "all"), Notification.is_read == False)
+    )
+    return result.scalar_one()
+
+
+async def push_unread_count(db: AsyncSession, user_id: int, seller_id: int | None = None) -> int:
+    """Send the current unread badge count to the user's open sockets."""
+    unread = await count_unread_notifications(db, user_id, seller_id)
     try:
-        result = await db.execute(select(Notification).where(Notification.id == notification_id, Notification.user_id == user_id))
-        notification = result.scalar_one_or_none()
+        await notification_manager.send_message({"type": "unread_count", "unread": unread}, user_id)
+    except Exception as e:
+        logger.warning(f"Failed to push unread count to user {user_id}: {e}")
+    return unread
+
+
+async def mark_notification_as_read(db: AsyncSession, notification_id: int, user_id: int, seller_id: int | None = None) -> Notification:
+    try:
+        result = await db.scalars(
+            update(Notification)
+            .where(Notification.id == notification_id, _scope_filter(user_id, seller_id, "all"))
+            .values(is_read=True)
+            .returning(Notification)
+        )
+        notification = result.one_or_none()
 
         if not notification:
             raise HTTPException(
@@ -89,9 +261,8 @@ async def mark_notification_as_read(db: AsyncSession, notification_id: int, user
                 detail="Notification not found."
             )
 
-        notification.is_read = True
         await db.commit()
-        await db.refresh(notification)
+        await push_unread_count(db, user_id, seller_id)
 
         logger.info(f"Marked notification {notification_id} as read for user {user_id}")
         return notification
@@ -107,20 +278,21 @@ async def mark_notification_as_read(db: AsyncSession, notification_id: int, user
             detail="Internal server error"
         )
     
-async def mark_all_notifications_as_read(db: AsyncSession, user_id: int) -> int:
+async def mark_all_notifications_as_read(db: AsyncSession, user_id: int, seller_id: int | None = None, scope: str = "user") -> dict:
     try:
-        result = await db.execute(select(Notification).where(Notification.user_id == user_id, Notification.is_read == False))
-        notifications = result.scalars().all()
-
-        if not notifications:
-            return 0
-
-        for notification in notifications:
-            notification.is_read = True
-
+        result = await db.execute(
+            update(Notification)
+            .where(_scope_filter(user_id, seller_id, scope), Notification.is_read == False)
+            .values(is_read=True)
+            .returning(Notification.id)
+            .execution_options(synchronize_session=False)
+        )
+        marked = len(result.scalars().all())
         await db.commit()
-        logger.info(f"Marked all notifications as read for user {user_id}")
-        return len(notifications)
+
+        unread = await push_unread_count(db, user_id, seller_id)
+        logger.info(f"Marked {marked} {scope} notifications as read for user {user_id}")
+        return {"marked": marked, "unread": unread}
 
     except HTTPException:
         raise
@@ -132,4 +304,3 @@ async def mark_all_notifications_as_read(db: AsyncSession, user_id: int) -> int:
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
         ) from e
-    
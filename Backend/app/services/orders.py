@@ -3,15 +3,20 @@ from fastapi import HTTPException, status
 from typing import Optional, List
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy import insert, delete
+from collections import defaultdict
 from sqlalchemy.orm import selectinload
 from app.models.orders import Order, OrderItem
 from app.models.cart import Cart, CartItem
 from app.models.products import Product, ProductVariant
-from app.schemas.orders import OrderCreate, OrderResponse, OrderItemResponse, OrderItemCreate, OrderCreateCart
+from app.schemas.orders import OrderCreate, OrderResponse, OrderItemResponse, OrderCreateCart
 from app.utils.reference import generate_order_code
-from app.services.notification import create_new_notification
+from app.services.notification import add_notification, wake_notification_dispatcher
 from datetime import datetime
 from app.utils.logger import logger
+from app.utils.product_cache import invalidate_products
+from app.services.seller_stats import record_order_placed, record_order_transition
+from app.services.stock import commit_order_stock, apply_stock_gate, revert_stock_gate
 
 
 async def get_orders_by_user(db: AsyncSession, user_id: int):
@@ -32,15 +37,60 @@ async def get_orders_by_user(db: AsyncSession, user_id: int):
             detail=f"An error occurred while fetching orders: {str(e)}"
         )
     
+async def _place_orders(db: AsyncSession, user_id: int, shipping_address: str, payment_method: str, lines_by_seller: list):
+    """
+    Insert one order per (seller, lines) pair plus all their items, two statements in total,
+    and stage the seller stats and outbox notifications in the same transaction.
+    """
+    created_at = datetime.utcnow().isoformat()
+    order_rows = [
+        {
+            "user_id": user_id,
+            "seller_id": seller.id,
+            "total_amount": sum(line["price"] * line["quantity"] for line in lines),
+            "shipping_address": shipping_address,
+            "status": "Pending",
+            "payment_status": "Unpaid",
+            "payment_method": payment_method,
+            "order_reference": generate_order_code(),
+            "shipping_fee": 70.0,
+            "created_at": created_at,
+        }
+        for seller, lines in lines_by_seller
+    ]
+    result = await db.scalars(insert(Order).returning(Order, sort_by_parameter_order=True), order_rows)
+    orders = result.all()
+
+    await db.execute(
+        insert(OrderItem),
+        [
+            {**line, "order_id": order.id}
+            for order, (seller, lines) in zip(orders, lines_by_seller)
+            for line in lines
+        ]
+    )
+
+    for seller, lines in lines_by_seller:
+        await record_order_placed(db, seller.id)
+        add_notification(db, user_id, f"Your order from {seller.business_name} has been placed successfully.", role="user")
+        add_notification(db, seller.id, "New Order Received.", role="seller")
+
+    return orders
+
+
 async def create_order_from_cart(db: AsyncSession, user_id: int, order_data: OrderCreateCart):
     try:
+        # Locking the cart rows makes a repeated checkout of the same items wait and then
+        # find them gone instead of ordering them twice.
         result = await db.execute(
                 select(CartItem)
-                .options(selectinload(CartItem.product), selectinload(CartItem.variant), selectinload(CartItem.cart))
+                .options(selectinload(CartItem.product).selectinload(Product.seller), selectinload(CartItem.variant))
                 .where(
                     CartItem.id.in_(order_data.cart_items_id),
                     CartItem.cart.has(Cart.user_id == user_id)
                 )
+                .order_by(CartItem.id)
+                .with_for_update(of=CartItem)
             )
         cart_items = result.scalars().all()
         if not cart_items:
@@ -48,61 +98,59 @@ async def create_order_from_cart(db: AsyncSession, user_id: int, order_data: Ord
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="No valid cart items found for checkout."
             )   
-        
-        items_by_seller = {}
-        for item in cart_items:
-            seller_id = item.product.seller_id
-            if seller_id not in items_by_seller:
-                items_by_seller[seller_id] = []
-            items_by_seller[seller_id].append(item)
-
-        new_orders = []
-
-        for seller_id, items in items_by_seller.items():
-            order_items = []
-            total_amount = 0.0
-
-            for item in items:
-                product = item.product
-                variant = item.variant
-
-                price = variant.price if variant else product.base_price
-                total_amount += price * item.quantity
-
-                order_items.append(
-                    OrderItemCreate(
-                        product_id=item.product_id,
-                        variant_id=item.variant_id,
-                        quantity=item.quantity,
-                        price=price
-                    )
-                )
-                logger.info(f"Prepared order item for product ID {item.product_id} with quantity {item.quantity} and price {price}")
-        
 
-            order_create_data = OrderCreate(
-                seller_id=seller_id,
-                shipping_address=order_data.shipping_address,
-                payment_method=order_data.payment_method,
-                items=order_items,
-                total_amount=total_amount
-            )
+        sellers = {}
+        lines_by_seller = defaultdict(list)
+        product_quantities = defaultdict(int)
+        variant_quantities = defaultdict(int)
 
-            new_order = await create_new_order(db, order_create_data, user_id)
-            new_orders.append(new_order)
+        for item in cart_items:
+            product = item.product
+            variant = item.variant
 
-            logger.info(f"Created order ID {new_order.id} for seller ID {seller_id} with total amount {total_amount}")
+            if variant:
+                price = variant.price
+                variant_quantities[variant.id] += item.quantity
+            else:
+                price = product.base_price
+                product_quantities[product.id] += item.quantity
+
+            sellers[product.seller_id] = product.seller
+            lines_by_seller[product.seller_id].append({
+                "product_id": item.product_id,
+                "variant_id": item.variant_id,
+                "quantity": item.quantity,
+                "price": price,
+            })
+
+        cart_item_ids = [item.id for item in cart_items]
+        await commit_order_stock(db, product_quantities, variant_quantities, cart_item_ids)
+
+        new_orders = await _place_orders(
+            db,
+            user_id,
+            order_data.shipping_address,
+            order_data.payment_method,
+            [(sellers[seller_id], lines) for seller_id, lines in lines_by_seller.items()]
+        )
 
-            for item in items:
-                await db.delete(item)
-                logger.info(f"Removed cart item ID {item.id} after checkout.")
+        await db.execute(delete(CartItem).where(CartItem.id.in_(cart_item_ids)))
         await db.commit()
+        await apply_stock_gate(db)
+        logger.info(f"Created orders {[order.id for order in new_orders]} from cart items {cart_item_ids} for user_id {user_id}")
+
+        wake_notification_dispatcher()
+        await invalidate_products(*{item.product_id for item in cart_items})
         return new_orders
+
     except HTTPException:
+        await db.rollback()
+        await revert_stock_gate(db)
         raise
 
     except Exception as e:
         await db.rollback()
+        await revert_stock_gate(db)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An error occurred while creating the order from cart: {str(e)}"
@@ -110,106 +158,86 @@ async def create_order_from_cart(db: AsyncSession, user_id: int, order_data: Ord
     
 async def create_new_order(db: AsyncSession, order_data: OrderCreate, user_id: int):
     try:
-        total_amount = 0.0
-        order_items_instances = []
+        if not order_data.items:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="An order needs at least one item."
+            )
+
+        product_ids = sorted({item.product_id for item in order_data.items})
+        variant_ids = sorted({item.variant_id for item in order_data.items if item.variant_id})
+
+        # Plain reads: stock is settled by commit_order_stock's conditional UPDATE, which only
+        # locks the stock rows for the short tail of the transaction.
+        result = await db.execute(
+            select(Product)
+            .options(selectinload(Product.seller))
+            .where(Product.id.in_(product_ids))
+        )
+        products = {product.id: product for product in result.scalars().all()}
+
+        variants = {}
+        if variant_ids:
+            result = await db.execute(
+                select(ProductVariant)
+                .where(ProductVariant.id.in_(variant_ids))
+            )
+            variants = {variant.id: variant for variant in result.scalars().all()}
+
+        lines = []
+        product_quantities = defaultdict(int)
+        variant_quantities = defaultdict(int)
 
         for item in order_data.items:
-            logger.info(f"Processing order item: {item}")
-            result = await db.execute(select(Product).options(selectinload(Product.seller)).where(Product.id == item.product_id))
-            existing_product = result.scalar_one_or_none()
-            logger.info(f"Retrieved product for order item: {existing_product}")
+            existing_product = products.get(item.product_id)
             if not existing_product:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail=f"Product with ID {item.product_id} not found."
                 )
-            if item.quantity > existing_product.stock:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Insufficient stock for product ID {item.product_id}."
-                )
-            
 
             if item.variant_id:
-                logger.info(f"Processing variant ID {item.variant_id} for order item: {item}")
-                result = await db.execute(select(ProductVariant).where(ProductVariant.id == item.variant_id, ProductVariant.product_id == item.product_id))
-                logger.info(f"Retrieved product variant for order item: {result}")
-                variant = result.scalar_one_or_none()
-                if not variant:
+                variant = variants.get(item.variant_id)
+                if not variant or variant.product_id != item.product_id:
                     raise HTTPException(
                         status_code=status.HTTP_404_NOT_FOUND,
                         detail=f"Product variant with ID {item.variant_id} not found."
                     )
                 price = variant.price
+                variant_quantities[variant.id] += item.quantity
             else:
                 price = existing_product.base_price
+                product_quantities[existing_product.id] += item.quantity
 
-            total_price = price * item.quantity
-            total_amount += total_price
+            lines.append({
+                "product_id": item.product_id,
+                "variant_id": item.variant_id,
+                "quantity": item.quantity,
+                "price": price,
+            })
 
-            order_item_instance = OrderItem(
-                product_id=item.product_id,
-                variant_id=item.variant_id,
-                quantity=item.quantity,
-                price=price,
-            )
-            order_items_instances.append(order_item_instance)
-            logger.info(f"Added order item instance: {order_item_instance}")
+        await commit_order_stock(db, product_quantities, variant_quantities)
 
-            if item.variant_id:
-                if item.quantity > variant.stock:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"Insufficient stock for variant ID {item.variant_id}."
-                    )
-                variant.stock -= item.quantity
-                logger.info(f"Decreased stock for variant ID {variant.id} by {item.quantity}. New stock: {variant.stock}")
-            else:
-                if item.quantity > existing_product.stock:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"Insufficient stock for product ID {item.product_id}."
-                    )
-                existing_product.stock -= item.quantity
-
-                logger.info(f"Decreased stock for product ID {existing_product.id} by {item.quantity}. New stock: {existing_product.stock}")
-
-        result = await db.execute(select(Product).where(Product.id == order_data.items[0].product_id))
-        existing_product = result.scalar_one_or_none()
-        order_code = generate_order_code()
-
-        new_order = Order(
-            user_id=user_id,
-            seller_id=existing_product.seller_id,
-            total_amount=total_amount,
-            shipping_address=order_data.shipping_address,
-            status="Pending",
-            payment_status="Unpaid",
-            payment_method=order_data.payment_method,
-            order_reference=order_code,
-            shipping_fee=70.0,
-            created_at=datetime.utcnow().isoformat()
+        seller = products[order_data.items[0].product_id].seller
+        (new_order,) = await _place_orders(
+            db, user_id, order_data.shipping_address, order_data.payment_method, [(seller, lines)]
         )
-        db.add(new_order)
-        await db.flush()
+        await db.commit()
+        await apply_stock_gate(db)
         logger.info(f"Created new order: {new_order}")
 
-        for order_item in order_items_instances:
-            order_item.order_id = new_order.id
-            db.add(order_item)
-            logger.info(f"Added order item to order: {order_item}")
-
-        await db.commit()
-        await db.refresh(new_order)
-        await create_new_notification(db, user_id, f"Your order from {existing_product.seller.business_name} has been placed successfully.", role="user")
-        await create_new_notification(db, existing_product.seller_id, "New Order Received.", role="seller")
+        wake_notification_dispatcher()
+        await invalidate_products(*product_ids)
         return new_order
         
 
     except HTTPException:
+        await db.rollback()
+        await revert_stock_gate(db)
         raise
     except Exception as e:
         await db.rollback()
+        await revert_stock_gate(db)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An error occurred while creating the order: {str(e)}"
@@ -267,7 +295,7 @@ async def get_order_by_id(db: AsyncSession, order_id: int) -> OrderResponse:
     
 async def cancel_order_by_id(db: AsyncSession, order_id: int, user_id: int) -> Order:
     try:
-        result = await db.execute(select(Order).where(Order.id == order_id))
+        result = await db.execute(select(Order).where(Order.id == order_id).with_for_update())
         order = result.scalar_one_or_none()
         if not order:
             raise HTTPException(
@@ -286,6 +314,7 @@ async def cancel_order_by_id(db: AsyncSession, order_id: int, user_id: int) -> O
             )
         
         order.status = "Cancelled"
+        await record_order_transition(db, order.seller_id, "Pending", "Cancelled")
         await db.commit()
         await db.refresh(order)
         logger.info(f"Order ID {order_id} cancelled.")
@@ -305,7 +334,7 @@ async def cancel_order_by_id(db: AsyncSession, order_id: int, user_id: int) -> O
     
 async def mark_order_as_received(db: AsyncSession, order_id: int, user_id: int) -> Order:
     try:
-        result = await db.execute(select(Order).where(Order.id == order_id))
+        result = await db.execute(select(Order).where(Order.id == order_id).with_for_update())
         order = result.scalar_one_or_none()
         if not order:
             raise HTTPException(
@@ -325,6 +354,7 @@ async def mark_order_as_received(db: AsyncSession, order_id: int, user_id: int)
         
         order.status = "Delivered"
         order.order_received_at = datetime.utcnow().isoformat()
+        await record_order_transition(db, order.seller_id, "Shipped", "Delivered", order.total_amount)
         await db.commit()
         await db.refresh(order)
         logger.info(f"Order ID {order_id} marked as received.")
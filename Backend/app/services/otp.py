@@ -0,0 +1,103 @@
+import html
+from functools import lru_cache
+from string import Template
+from fastapi import HTTPException, status
+from app.core.config import settings
+from app.utils.cache import get_redis, pipeline
+from app.utils.email import queue_email
+from app.utils.logger import logger
+from app.utils.otp import generate_otp
+
+EMAIL_VERIFICATION = "email_verification"
+PASSWORD_RESET = "password_reset"
+
+# purpose -> (title shown in the email, Redis key prefix)
+_PURPOSES = {
+    EMAIL_VERIFICATION: ("Email Verification", "email_verification_otp"),
+    PASSWORD_RESET: ("Reset Password", "password_reset_otp"),
+}
+
+_OTP_EMAIL = Template("""
+<div style="font-family: Arial, sans-serif; text-align: center; padding: 20px;">
+    <h2 style="color: #e91e63;">Your OTP Code for $title</h2>
+    <p style="font-size: 16px; color: #333;">Use the following code to proceed:</p>
+    <div style="margin: 20px 0; font-size: 24px; font-weight: bold; color: #000; letter-spacing: 4px;">
+        $otp
+    </div>
+    <p style="font-size: 14px; color: #666;">This code is valid for $minutes minutes. Do not share it with anyone.</p>
+    <hr style="margin: 20px 0; border: none; border-top: 1px solid #ddd;">
+    <p style="font-size: 12px; color: #999;">If you did not request this, please ignore this email.</p>
+</div>
+""")
+
+# Compares and consumes in one round-trip. A wrong code bumps the attempt counter, which
+# lives as long as the OTP; reaching OTP_MAX_ATTEMPTS burns the OTP.
+# Returns 1 verified, 0 missing or expired, -1 wrong code, -2 too many attempts.
+_VERIFY_SCRIPT = """
+local stored = redis.call('GET', KEYS[1])
+if not stored then return 0 end
+if stored == ARGV[1] then
+    redis.call('DEL', KEYS[1], KEYS[2])
+    return 1
+end
+local attempts = redis.call('INCR', KEYS[2])
+if attempts == 1 then
+    redis.call('EXPIRE', KEYS[2], math.max(redis.call('TTL', KEYS[1]), 1))
+end
+if attempts >= tonumber(ARGV[2]) then
+    redis.call('DEL', KEYS[1], KEYS[2])
+    return -2
+end
+return -1
+"""
+
+
+def _keys(purpose: str, email: str):
+    prefix = _PURPOSES[purpose][1]
+    return f"{prefix}:{email}", f"{prefix}_attempts:{email}"
+
+
+@lru_cache(maxsize=None)
+def _template(purpose: str) -> Template:
+    """The OTP email with everything but the code filled in, built once per purpose."""
+    title = html.escape(_PURPOSES[purpose][0])
+    return Template(_OTP_EMAIL.safe_substitute(title=title, minutes=settings.OTP_TTL_SECONDS // 60))
+
+
+async def issue_otp(email: str, purpose: str) -> None:
+    """Store a fresh OTP for `purpose`, reset its attempt counter and queue the email."""
+    otp = generate_otp()
+    otp_key, attempts_key = _keys(purpose, email)
+    async with pipeline() as pipe:
+        pipe.setex(otp_key, settings.OTP_TTL_SECONDS, otp)
+        pipe.delete(attempts_key)
+        await pipe.execute()
+
+    queue_email(email, f"Your OTP Code for {_PURPOSES[purpose][0]}", _template(purpose).substitute(otp=otp))
+    logger.info(f"Issued {purpose} OTP for email: {email}")
+
+
+async def verify_otp(email: str, purpose: str, otp: str) -> None:
+    """Check and consume an OTP. Raises 400 for a missing or wrong code and 429 once attempts run out."""
+    # Registered against the current client on each call: close_redis() replaces the client, and
+    # a Script bound at import would keep running on the closed one. Script caches its SHA.
+    result = await get_redis().register_script(_VERIFY_SCRIPT)(
+        keys=list(_keys(purpose, email)), args=[otp, settings.OTP_MAX_ATTEMPTS]
+    )
+    if result == 1:
+        return
+    if result == 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="OTP has expired or is invalid"
+        )
+    if result == -2:
+        logger.warning(f"Too many {purpose} OTP attempts for email: {email}")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many invalid attempts. Please request a new OTP."
+        )
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid OTP"
+    )
@@ -3,15 +3,18 @@ from fastapi import HTTPException, status, UploadFile
 from fastapi.responses import JSONResponse
 from app.models.products import Product, VariantAttribute, VariantCategory, ProductVariant, variant_attribute_values, ProductImage
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update
+from sqlalchemy import select, update, or_, not_, tuple_
 from app.schemas.product import ProductCreate, VariantCreate, VariantCategoryCreate, UpdateVariantCategory, UpdateProduct
 from collections import defaultdict
 from itertools import product
 from sqlalchemy.orm import selectinload
 import json
-from app.utils.cloudinary import upload_image_to_cloudinary, delete_image_from_cloudinary
+from app.utils.cloudinary import upload_image_to_cloudinary, upload_images, delete_image_from_cloudinary
 from app.utils.logger import logger
+from app.utils.pagination import encode_cursor, decode_cursor
+from app.utils.product_cache import get_cached_product, set_cached_product, invalidate_products, serialize_product
 from app.models.category import ProductCategory
+from app.services.seller_stats import record_product_count
 
 
 async def get_all_product_categories(db: AsyncSession):
@@ -31,12 +34,63 @@ async def get_all_product_categories(db: AsyncSession):
             detail="An error occurred while fetching product categories."
         )
 
-async def get_all_products(db: AsyncSession):
-    try: 
-        result = await db.execute(select(Product).options(selectinload(Product.variants)).options(selectinload(Product.images)).options(selectinload(Product.category)).options(selectinload(Product.seller)))
+async def get_all_products(
+    db: AsyncSession,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    category_id: Optional[int] = None,
+    seller_id: Optional[int] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    in_stock: Optional[bool] = None
+):
+    try:
+        query = (
+            select(Product)
+            .options(selectinload(Product.variants))
+            .options(selectinload(Product.images))
+            .options(selectinload(Product.category))
+            .options(selectinload(Product.seller))
+        )
+
+        if category_id is not None:
+            query = query.where(Product.category_id == category_id)
+        if seller_id is not None:
+            query = query.where(Product.seller_id == seller_id)
+        if min_price is not None:
+            query = query.where(Product.base_price >= min_price)
+        if max_price is not None:
+            query = query.where(Product.base_price <= max_price)
+        if in_stock is not None:
+            has_stock = or_(Product.stock > 0, Product.variants.any(ProductVariant.stock > 0))
+            query = query.where(has_stock if in_stock else not_(has_stock))
+
+        last_seen = decode_cursor(cursor, 2)
+        if last_seen:
+            created_at, product_id = last_seen
+            if not isinstance(created_at, str) or not isinstance(product_id, int) or isinstance(product_id, bool):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Invalid pagination cursor."
+                )
+            query = query.where(tuple_(Product.created_at, Product.id) < tuple_(*last_seen))
+
+        # Fetch one extra row to know whether another page exists without a COUNT(*).
+        result = await db.execute(
+            query.order_by(Product.created_at.desc(), Product.id.desc()).limit(limit + 1)
+        )
         products = result.scalars().all()
-        logger.info(f"Retrieved all products: {products}")
-        return products
+
+        next_cursor = None
+        if len(products) > limit:
+            products = products[:limit]
+            next_cursor = encode_cursor(products[-1].created_at, products[-1].id)
+
+        logger.info(f"Retrieved {len(products)} products (cursor={cursor})")
+        return {
+            "items": products,
+            "next_cursor": next_cursor
+        }
     
     except HTTPException:
         raise
@@ -68,6 +122,10 @@ async def get_products_by_seller(db: AsyncSession, seller_id: int):
 
 async def get_product_by_id(db: AsyncSession, product_id: int):
     try:
+        cached, version = await get_cached_product(product_id)
+        if cached is not None:
+            return cached
+
         result = await db.execute(select(Product).options(selectinload(Product.variants)).options(selectinload(Product.images)).options(selectinload(Product.category)).options(selectinload(Product.seller)).where(Product.id == product_id))
         product = result.scalar_one_or_none()
         if not product:
@@ -75,13 +133,10 @@ async def get_product_by_id(db: AsyncSession, product_id: int):
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Product not found."
             )
-        if product.has_variants:
-            variants = await get_variants_by_product_id(db, product_id)
-        
-        return {
-            "product": product,
-            "variants": variants if product.has_variants else []
-        }
+
+        payload = serialize_product(product)
+        await set_cached_product(product_id, version, payload)
+        return payload
     except HTTPException:
         raise
 
@@ -118,6 +173,7 @@ async def add_product_service(db: AsyncSession, product: ProductCreate, seller_i
         )
         
         db.add(new_product)
+        await record_product_count(db, seller_id, 1)
         await db.commit()
         await db.refresh(new_product)
         logger.info(f"Created new product: {new_product}")
@@ -150,16 +206,17 @@ async def add_product_images(db: AsyncSession, product_id: int, images: List[Upl
                 detail="A product can have a maximum of 10 images."
             )
 
-        for image in images:
-            upload_result = await upload_image_to_cloudinary([image], folder="product_images")
+        upload_results = await upload_image_to_cloudinary(images, folder="product_images")
+        for upload_result in upload_results:
             new_image = ProductImage(
                 product_id=product_id,
-                image_url=upload_result[0]["secure_url"]
+                image_url=upload_result["secure_url"]
             )
             db.add(new_image)
             product_images.append(new_image)
             logger.info(f"Added product image: {new_image.image_url} for product_id {product_id}")
         await db.commit()
+        await invalidate_products(product_id)
         return product_images
     
     except HTTPException:
@@ -190,6 +247,7 @@ async def update_product_service(db: AsyncSession, product_id: int, product_upda
         db.add(product)
         await db.commit()
         await db.refresh(product)
+        await invalidate_products(product_id)
         logger.info(f"Updated product_id {product_id}: {product}")
         
         return product
@@ -309,7 +367,20 @@ async def update_variants(db: AsyncSession, files, variant_ids, variant_data):
         
         logger.info(f"Updating variants with IDs: {variant_ids_list}")
 
+        # Upload every replacement image up front, concurrently, instead of one per loop iteration.
+        upload_ids = [
+            variant_info["variant_id"] for variant_info in variant_data_list
+            if not variant_info.get("remove_image") and variant_info["variant_id"] in file_map
+        ]
+        upload_results = await upload_images([file_map[variant_id] for variant_id in upload_ids], folder="product-variants")
+        uploaded_urls = {
+            variant_id: upload_result["secure_url"]
+            for variant_id, upload_result in zip(upload_ids, upload_results)
+            if upload_result is not None
+        }
+
         results = []
+        updated_product_ids = set()
 
         for variant_info in variant_data_list:
             variant_id = variant_info["variant_id"]
@@ -329,10 +400,9 @@ async def update_variants(db: AsyncSession, files, variant_ids, variant_data):
                     logger.info(f"Deleted image from Cloudinary for variant_id {variant_id}")
                 logger.info(f"Removed image for variant_id {variant_id}")
 
-            elif variant_id in file_map:
+            elif variant_id in uploaded_urls:
 
-                upload_result = await upload_image_to_cloudinary([file_map[variant_id]], folder="product-variants")
-                new_image_url = upload_result[0]["secure_url"]
+                new_image_url = uploaded_urls[variant_id]
                 logger.info(f"Updated image for variant_id {variant_id}: {new_image_url}")
 
             await db.execute(
@@ -346,6 +416,7 @@ async def update_variants(db: AsyncSession, files, variant_ids, variant_data):
             )
             logger.info(f"Updated variant_id {variant_id} with price: {variant_info.get('price', variant.price)}, stock: {variant_info.get('stock', variant.stock)}")
 
+            updated_product_ids.add(variant.product_id)
             results.append({
                 "variant_id": variant_id,
                 "price": variant_info.get("price", variant.price),
@@ -354,6 +425,7 @@ async def update_variants(db: AsyncSession, files, variant_ids, variant_data):
             })
 
         await db.commit()
+        await invalidate_products(*updated_product_ids)
         return {"message": f"Updated {len(results)} variants", "results": results}
     
 
@@ -518,6 +590,7 @@ async def update_variant_category_service(db: AsyncSession, category_update: Upd
 
         await db.commit()
         await db.refresh(category)
+        await invalidate_products(category.product_id)
         return category
     
     except HTTPException:
@@ -541,7 +614,9 @@ async def delete_product_service(db: AsyncSession, product_id: int) -> JSONRespo
         )
     
     await db.delete(product)
+    await record_product_count(db, product.seller_id, -1)
     await db.commit()
+    await invalidate_products(product_id)
     
     return JSONResponse(
         status_code=status.HTTP_200_OK,
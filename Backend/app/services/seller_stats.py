@@ -0,0 +1,148 @@
+from datetime import datetime
+from typing import Optional
+from fastapi import HTTPException, status
+from sqlalchemy import select, delete, insert, func, literal
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.sellers import Seller, SellerStats
+from app.models.orders import Order
+from app.models.products import Product
+from app.utils.logger import logger
+
+STATUS_COLUMNS = {
+    "Pending": "pending_orders",
+    "Confirmed": "confirmed_orders",
+    "Shipped": "shipped_orders",
+    "Delivered": "delivered_orders",
+    "Cancelled": "cancelled_orders",
+}
+
+RANKABLE_COLUMNS = ("total_revenue", "total_orders", "delivered_orders", "product_count")
+
+
+async def _apply_deltas(db: AsyncSession, seller_id: int, **deltas) -> None:
+    """
+    Add `deltas` to the seller's counters with a single upsert. Runs inside the caller's
+    transaction so the counters commit or roll back together with the order change.
+    """
+    statement = pg_insert(SellerStats).values(seller_id=seller_id, updated_at=datetime.utcnow(), **deltas)
+    statement = statement.on_conflict_do_update(
+        index_elements=[SellerStats.seller_id],
+        set_={
+            **{column: getattr(SellerStats, column) + getattr(statement.excluded, column) for column in deltas},
+            "updated_at": statement.excluded.updated_at,
+        }
+    )
+    await db.execute(statement)
+
+
+async def record_order_placed(db: AsyncSession, seller_id: int, count: int = 1) -> None:
+    await _apply_deltas(db, seller_id, total_orders=count, pending_orders=count)
+
+
+async def record_order_transition(db: AsyncSession, seller_id: int, from_status: str, to_status: str, amount: float = 0.0) -> None:
+    deltas = {
+        STATUS_COLUMNS[from_status]: -1,
+        STATUS_COLUMNS[to_status]: 1,
+    }
+    if to_status == "Delivered":
+        deltas["total_revenue"] = amount
+    await _apply_deltas(db, seller_id, **deltas)
+
+
+async def record_product_count(db: AsyncSession, seller_id: int, delta: int) -> None:
+    await _apply_deltas(db, seller_id, product_count=delta)
+
+
+async def get_seller_stats(db: AsyncSession, seller_id: int) -> Optional[SellerStats]:
+    result = await db.execute(select(SellerStats).where(SellerStats.seller_id == seller_id))
+    return result.scalar_one_or_none()
+
+
+async def rebuild_seller_stats(db: AsyncSession, seller_id: Optional[int] = None) -> int:
+    """Recompute seller_stats from orders and products. Rebuilds every seller unless one is given."""
+    order_totals = (
+        select(
+            Order.seller_id,
+            func.count(Order.id).label("total_orders"),
+            func.coalesce(func.sum(Order.total_amount).filter(Order.status == "Delivered"), 0.0).label("total_revenue"),
+            *[
+                func.count(Order.id).filter(Order.status == order_status).label(column)
+                for order_status, column in STATUS_COLUMNS.items()
+            ]
+        )
+        .group_by(Order.seller_id)
+        .subquery()
+    )
+    product_totals = (
+        select(Product.seller_id, func.count(Product.id).label("product_count"))
+        .group_by(Product.seller_id)
+        .subquery()
+    )
+
+    columns = ["total_revenue", "total_orders", *STATUS_COLUMNS.values()]
+    source = (
+        select(
+            Seller.id,
+            *[func.coalesce(order_totals.c[column], 0) for column in columns],
+            func.coalesce(product_totals.c.product_count, 0),
+            literal(datetime.utcnow())
+        )
+        .outerjoin(order_totals, order_totals.c.seller_id == Seller.id)
+        .outerjoin(product_totals, product_totals.c.seller_id == Seller.id)
+    )
+
+    clear = delete(SellerStats)
+    if seller_id is not None:
+        source = source.where(Seller.id == seller_id)
+        clear = clear.where(SellerStats.seller_id == seller_id)
+
+    try:
+        await db.execute(clear)
+        result = await db.execute(
+            insert(SellerStats).from_select(
+                ["seller_id", *columns, "product_count", "updated_at"],
+                source
+            )
+        )
+        await db.commit()
+        logger.info(f"Rebuilt seller stats for {result.rowcount} sellers")
+        return result.rowcount
+
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Error rebuilding seller stats: {e}")
+        raise
+
+
+async def get_seller_rankings(db: AsyncSession, metric: str = "total_revenue", limit: int = 20):
+    if metric not in RANKABLE_COLUMNS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cannot rank sellers by '{metric}'. Choose one of: {', '.join(RANKABLE_COLUMNS)}."
+        )
+    try:
+        result = await db.execute(
+            select(SellerStats, Seller.business_name)
+            .join(Seller, Seller.id == SellerStats.seller_id)
+            .order_by(getattr(SellerStats, metric).desc(), SellerStats.seller_id)
+            .limit(limit)
+        )
+        return [
+            {
+                "seller_id": stats.seller_id,
+                "business_name": business_name,
+                "total_revenue": stats.total_revenue,
+                "total_orders": stats.total_orders,
+                "delivered_orders": stats.delivered_orders,
+                "product_count": stats.product_count,
+            }
+            for stats, business_name in result.all()
+        ]
+
+    except Exception as e:
+        logger.error(f"Error ranking sellers by {metric}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to rank sellers."
+        ) from e
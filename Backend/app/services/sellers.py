@@ -1,5 +1,6 @@
+import asyncio
 from datetime import datetime
-from sqlalchemy import select
+from sqlalchemy import select, func
 from sqlalchemy.orm import selectinload
 from fastapi import HTTPException, status
 from fastapi.responses import JSONResponse
@@ -10,9 +11,13 @@ from typing import List
 from app.utils.logger import logger
 from app.models.orders import Order
 from app.models.services import Service
-from app.services.notification import create_new_notification
+from app.services.notification import add_notification, wake_notification_dispatcher
 from app.schemas.sellers import SwitchRoleRequest
 from app.models.users import User
+from app.db.database import AsyncSessionLocal
+from app.services.seller_stats import get_seller_stats, record_order_transition
+from app.utils.principal_cache import invalidate_principals, publish_token_version
+from app.services.users import bump_token_version
 
 async def become_a_seller(db: AsyncSession, seller_data: SellerCreate, user_id: int) -> Seller:
     try:
@@ -53,7 +58,10 @@ async def become_a_seller(db: AsyncSession, seller_data: SellerCreate, user_id:
         user.is_seller = True
         db.add(user)
         db.add(new_seller)
+        token_version = await bump_token_version(db, user_id)
         await db.commit()
+        await invalidate_principals(user_id)
+        await publish_token_version(user_id, token_version)
         await db.refresh(new_seller)
 
 
@@ -88,7 +96,10 @@ async def switch_role(db: AsyncSession, user_id: int, switch_role_request: Switc
         #     )
 
         seller.is_seller_mode = switch_role_request.is_seller_mode
+        token_version = await bump_token_version(db, user_id)
         await db.commit()
+        await invalidate_principals(user_id)
+        await publish_token_version(user_id, token_version)
         await db.refresh(seller)
 
         return seller
@@ -151,7 +162,7 @@ async def get_all_orders_by_seller(db: AsyncSession, seller_id: int) -> List[Ord
     
 async def confirm_order_by_id(db: AsyncSession, order_id: int, seller_id: int) -> Order:
     try:
-        result = await db.execute(select(Order).options(selectinload(Order.seller)).where(Order.id == order_id))
+        result = await db.execute(select(Order).options(selectinload(Order.seller)).where(Order.id == order_id).with_for_update())
         order = result.scalar_one_or_none()
         if order.seller_id != seller_id:
             raise HTTPException(
@@ -170,8 +181,10 @@ async def confirm_order_by_id(db: AsyncSession, order_id: int, seller_id: int) -
             )
         
         order.status = "Confirmed"
-        await create_new_notification(db, order.user_id, f"Your order from {order.seller.business_name} has been confirmed.", role="user")
+        await record_order_transition(db, order.seller_id, "Pending", "Confirmed")
+        add_notification(db, order.user_id, f"Your order from {order.seller.business_name} has been confirmed.", role="user")
         await db.commit()
+        wake_notification_dispatcher()
         await db.refresh(order)
         logger.info(f"Order ID {order_id} confirmed.")
 
@@ -188,117 +201,41 @@ async def confirm_order_by_id(db: AsyncSession, order_id: int, seller_id: int) -
             detail="Failed to confirm the order."
         ) from e
     
-async def get_revenue(db: AsyncSession, seller_id: int) -> float:
+async def get_order_metrics(db: AsyncSession, seller_id: int) -> dict:
     try:
         result = await db.execute(
-            select(Order).where(
-                Order.seller_id == seller_id,
-                Order.status == "Delivered"
-            )
-        )
-        orders = result.scalars().all()
-        total_revenue = sum(order.total_amount for order in orders)
-        logger.info(f"Total revenue for seller_id {seller_id} is {total_revenue}")
-        return total_revenue
-    
-    except HTTPException:
-        raise
-
-    except Exception as e:
-        logger.error(f"Error calculating revenue for seller_id {seller_id}: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to calculate seller revenue."
-        ) from e
-    
-async def get_total_orders_count(db: AsyncSession, seller_id: int) -> int:
-    try:
-        result = await db.execute(
-            select(Order).where(Order.seller_id == seller_id)
-        )
-        orders = result.scalars().all()
-        total_orders = len(orders)
-        logger.info(f"Total orders count for seller_id {seller_id} is {total_orders}")
-        return total_orders
-    
-    except HTTPException:
-        raise
-
-    except Exception as e:
-        logger.error(f"Error calculating total orders count for seller_id {seller_id}: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to calculate total orders count."
-        ) from e
-    
-async def get_pending_orders_count(db: AsyncSession, seller_id: int) -> int:
-    try:
-        result = await db.execute(
-            select(Order).where(
-                Order.seller_id == seller_id,
-                Order.status == "Pending"
-            )
-        )
-        orders = result.scalars().all()
-        pending_orders = len(orders)
-        logger.info(f"Pending orders count for seller_id {seller_id} is {pending_orders}")
-        return pending_orders
-    
-    except HTTPException:
-        raise
-
-    except Exception as e:
-        logger.error(f"Error calculating pending orders count for seller_id {seller_id}: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to calculate pending orders count."
-        ) from e
-    
-
-async def get_shipped_orders_count(db: AsyncSession, seller_id: int) -> int:
-    try:
-        result = await db.execute(
-            select(Order).where(
-                Order.seller_id == seller_id,
-                Order.status == "Shipped"
-            )
-        )
-        orders = result.scalars().all()
-        shipped_orders = len(orders)
-        logger.info(f"Shipped orders count for seller_id {seller_id} is {shipped_orders}")
-        return shipped_orders
-    
-    except HTTPException:
-        raise
-
-    except Exception as e:
-        logger.error(f"Error calculating shipped orders count for seller_id {seller_id}: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to calculate shipped orders count."
-        ) from e
-    
-async def get_delivered_orders_count(db: AsyncSession, seller_id: int) -> int:
-    try:
-        result = await db.execute(
-            select(Order).where(
-                Order.seller_id == seller_id,
-                Order.status == "Delivered"
+            select(
+                Order.status,
+                func.count(Order.id),
+                func.coalesce(func.sum(Order.total_amount), 0.0)
             )
+            .where(Order.seller_id == seller_id)
+            .group_by(Order.status)
         )
-        orders = result.scalars().all()
-        delivered_orders = len(orders)
-        logger.info(f"Delivered orders count for seller_id {seller_id} is {delivered_orders}")
-        return delivered_orders
+        counts = {}
+        amounts = {}
+        for order_status, count, amount in result.all():
+            counts[order_status] = count
+            amounts[order_status] = amount
+
+        metrics = {
+            "total_revenue": amounts.get("Delivered", 0.0),
+            "total_orders": sum(counts.values()),
+            "pending_orders": counts.get("Pending", 0),
+            "shipped_orders": counts.get("Shipped", 0),
+            "delivered_orders": counts.get("Delivered", 0)
+        }
+        logger.info(f"Order metrics for seller_id {seller_id}: {metrics}")
+        return metrics
     
     except HTTPException:
         raise
 
     except Exception as e:
-        logger.error(f"Error calculating delivered orders count for seller_id {seller_id}: {e}")
+        logger.error(f"Error calculating order metrics for seller_id {seller_id}: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to calculate delivered orders count."
+            detail="Failed to calculate order metrics."
         ) from e
     
 async def get_recent_orders(db: AsyncSession, seller_id: int, limit: int = 5) -> List[Order]:
@@ -326,7 +263,7 @@ async def get_recent_orders(db: AsyncSession, seller_id: int, limit: int = 5) ->
 
 async def send_shipping_link(db: AsyncSession, order_id: int, shipping_link: str, seller_id: int) -> Order:
     try:
-        result = await db.execute(select(Order).where(Order.id == order_id))
+        result = await db.execute(select(Order).where(Order.id == order_id).with_for_update())
         order = result.scalar_one_or_none()
         if order.seller_id != seller_id:
             raise HTTPException(
@@ -347,6 +284,7 @@ async def send_shipping_link(db: AsyncSession, order_id: int, shipping_link: str
         order.shipping_link = shipping_link
         order.shipped_at = datetime.utcnow().isoformat()
         order.status = "Shipped"
+        await record_order_transition(db, order.seller_id, "Confirmed", "Shipped")
         await db.commit()
         await db.refresh(order)
         logger.info(f"Shipping link for Order ID {order_id} updated.")
@@ -366,7 +304,7 @@ async def send_shipping_link(db: AsyncSession, order_id: int, shipping_link: str
     
 async def mark_order_as_delivered(db: AsyncSession, order_id: int, seller_id: int) -> Order:
     try:
-        result = await db.execute(select(Order).where(Order.id == order_id))
+        result = await db.execute(select(Order).where(Order.id == order_id).with_for_update())
         order = result.scalar_one_or_none()
         if order.seller_id != seller_id:
             raise HTTPException(
@@ -385,6 +323,7 @@ async def mark_order_as_delivered(db: AsyncSession, order_id: int, seller_id: in
             )
         
         order.status = "Delivered"
+        await record_order_transition(db, order.seller_id, "Shipped", "Delivered", order.total_amount)
         await db.commit()
         await db.refresh(order)
         logger.info(f"Order ID {order_id} marked as delivered.")
@@ -422,4 +361,36 @@ async def get_recent_inquiries(db: AsyncSession, seller_id: int, limit: int = 5)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to fetch recent inquiries."
-        ) from e
\ No newline at end of file
+        ) from e
+
+async def get_dashboard_metrics(db: AsyncSession, seller_id: int) -> dict:
+    async def fetch_order_metrics():
+        stats = await get_seller_stats(db, seller_id)
+        if stats is None:
+            logger.warning(f"No seller_stats row for seller_id {seller_id}, aggregating orders instead")
+            return await get_order_metrics(db, seller_id)
+        return {
+            "total_revenue": stats.total_revenue,
+            "total_orders": stats.total_orders,
+            "pending_orders": stats.pending_orders,
+            "shipped_orders": stats.shipped_orders,
+            "delivered_orders": stats.delivered_orders
+        }
+
+    async def fetch_recent_activity():
+        # A session can only run one statement at a time, so the recent lists get their own.
+        async with AsyncSessionLocal() as session:
+            recent_orders = await get_recent_orders(session, seller_id)
+            recent_inquiries = await get_recent_inquiries(session, seller_id)
+            return recent_orders, recent_inquiries
+
+    order_metrics, (recent_orders, recent_inquiries) = await asyncio.gather(
+        fetch_order_metrics(),
+        fetch_recent_activity()
+    )
+
+    return {
+        **order_metrics,
+        "recent_orders": recent_orders,
+        "recent_inquiries": recent_inquiries
+    }
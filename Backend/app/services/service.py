@@ -42,11 +42,11 @@ async def upload_service_image(db: AsyncSession, service_id: int, files: list[Up
             )
 
         uploaded_images = []
-        for file in files:
-            upload_result = await upload_image_to_cloudinary([file], folder="services_images")
+        upload_results = await upload_image_to_cloudinary(files, folder="services_images")
+        for upload_result in upload_results:
             new_service_image = ServiceImage(
                 service_id=service_id,
-                image_url=upload_result[0]["secure_url"],
+                image_url=upload_result["secure_url"],
             )
             db.add(new_service_image)
             uploaded_images.append(new_service_image)
@@ -0,0 +1,310 @@
+import asyncio
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import select, update, delete, values, column, Integer
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal
+from app.models.cart import CartItem, StockReservation
+from app.models.products import Product, ProductVariant
+from app.utils.cache import get_redis
+from app.utils.logger import logger
+from app.utils.product_cache import invalidate_products
+
+SWEEP_BATCH_SIZE = 500
+
+# Hot-SKU gate. An armed SKU has a Redis counter seeded from its database stock; requests that
+# would take more than the counter holds are turned away before they reach Postgres. The
+# database decrement stays authoritative, so a drifted counter can only reject early or let
+# extra requests through to the conditional UPDATE, never oversell.
+_GATE_TAKE_SCRIPT = """
+local available = redis.call('GET', KEYS[1])
+if not available then return -1 end
+if tonumber(available) < tonumber(ARGV[1]) then return -2 end
+return redis.call('DECRBY', KEYS[1], ARGV[1])
+"""
+
+_GATE_RETURN_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then return -1 end
+return redis.call('INCRBY', KEYS[1], ARGV[1])
+"""
+
+
+def _gate_key(model, row_id: int) -> str:
+    return f"stock:{model.__tablename__}:{row_id}"
+
+
+def _gate_pending(db: AsyncSession) -> dict:
+    return db.info.setdefault("stock_gate", {"taken": [], "returned": []})
+
+
+async def _gate_take(db: AsyncSession, model, row_id: int, quantity: int, label: str) -> None:
+    if not settings.STOCK_HOT_SKU_GATE:
+        return
+    key = _gate_key(model, row_id)
+    try:
+        remaining = await get_redis().register_script(_GATE_TAKE_SCRIPT)(keys=[key], args=[quantity])
+    except Exception as e:
+        logger.warning(f"Stock gate unavailable for {key}, falling back to the database: {e}")
+        return
+
+    if remaining == -2:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Insufficient stock for {label} ID {row_id}."
+        )
+    if remaining != -1:
+        _gate_pending(db)["taken"].append((key, quantity))
+
+
+async def _gate_restore(entries) -> None:
+    for key, quantity in entries:
+        try:
+            await get_redis().register_script(_GATE_RETURN_SCRIPT)(keys=[key], args=[quantity])
+        except Exception as e:
+            logger.warning(f"Failed to return {quantity} units to stock gate {key}: {e}")
+
+
+async def apply_stock_gate(db: AsyncSession) -> None:
+    """Call after a successful commit: hands units returned to stock back to the gate counters."""
+    pending = db.info.pop("stock_gate", None)
+    if settings.STOCK_HOT_SKU_GATE and pending:
+        await _gate_restore(pending["returned"])
+
+
+async def revert_stock_gate(db: AsyncSession) -> None:
+    """Call after a rollback: undoes gate decrements made by the failed transaction."""
+    pending = db.info.pop("stock_gate", None)
+    if settings.STOCK_HOT_SKU_GATE and pending:
+        await _gate_restore(pending["taken"])
+
+
+async def arm_hot_sku(db: AsyncSession, product_id: int, variant_id: Optional[int] = None) -> dict:
+    """Seed the gate counter for a SKU from its current stock. Arm before the sale opens."""
+    model, row_id = (ProductVariant, variant_id) if variant_id else (Product, product_id)
+    result = await db.execute(select(model.stock).where(model.id == row_id))
+    stock = result.scalar_one_or_none()
+    if stock is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"{model.__name__} with ID {row_id} not found."
+        )
+
+    key = _gate_key(model, row_id)
+    await get_redis().set(key, stock)
+    logger.info(f"Armed stock gate {key} with {stock} units")
+    return {"key": key, "stock": stock}
+
+
+async def disarm_hot_sku(product_id: int, variant_id: Optional[int] = None) -> None:
+    model, row_id = (ProductVariant, variant_id) if variant_id else (Product, product_id)
+    await get_redis().delete(_gate_key(model, row_id))
+    logger.info(f"Disarmed stock gate {_gate_key(model, row_id)}")
+
+
+async def _adjust(db: AsyncSession, model, deltas: Dict[int, int], label: str) -> None:
+    """
+    Apply signed stock deltas to rows of `model`: positive takes units, negative returns them.
+    Takes are conditional (stock >= quantity) and raise 400 if any row is short; the caller
+    must then roll back.
+    """
+    deltas = {row_id: delta for row_id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    takes = {row_id: delta for row_id, delta in deltas.items() if delta > 0}
+    returns = {row_id: -delta for row_id, delta in deltas.items() if delta < 0}
+
+    for row_id, quantity in sorted(takes.items()):
+        await _gate_take(db, model, row_id, quantity, label)
+
+    # Rows are locked in id order, products before variants, so transactions touching
+    # several of the same rows always queue up instead of deadlocking.
+    if len(deltas) > 1:
+        await db.execute(
+            select(model.id).where(model.id.in_(deltas)).order_by(model.id).with_for_update()
+        )
+
+    if takes:
+        requested = values(
+            column("id", Integer), column("quantity", Integer), name="requested", literal_binds=True
+        ).data(sorted(takes.items()))
+        result = await db.execute(
+            update(model)
+            .where(model.id == requested.c.id, model.stock >= requested.c.quantity)
+            .values(stock=model.stock - requested.c.quantity)
+            .returning(model.id)
+            .execution_options(synchronize_session=False)
+        )
+        short = set(takes) - set(result.scalars().all())
+        if short:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Insufficient stock for {label} ID {min(short)}."
+            )
+
+    if returns:
+        released = values(
+            column("id", Integer), column("quantity", Integer), name="released", literal_binds=True
+        ).data(sorted(returns.items()))
+        await db.execute(
+            update(model)
+            .where(model.id == released.c.id)
+            .values(stock=model.stock + released.c.quantity)
+            .execution_options(synchronize_session=False)
+        )
+        if settings.STOCK_HOT_SKU_GATE:
+            _gate_pending(db)["returned"].extend((_gate_key(model, row_id), quantity) for row_id, quantity in returns.items())
+
+    logger.info(f"Adjusted {label} stock: {deltas}")
+
+
+def _split(rows) -> Tuple[Dict[int, int], Dict[int, int]]:
+    """Sum (product_id, variant_id, quantity) rows into product and variant quantities."""
+    products, variants = defaultdict(int), defaultdict(int)
+    for product_id, variant_id, quantity in rows:
+        if variant_id:
+            variants[variant_id] += quantity
+        else:
+            products[product_id] += quantity
+    return products, variants
+
+
+async def take_stock(db: AsyncSession, product_quantities: Dict[int, int], variant_quantities: Dict[int, int]) -> None:
+    await _adjust(db, Product, product_quantities, "product")
+    await _adjust(db, ProductVariant, variant_quantities, "variant")
+
+
+async def return_stock(db: AsyncSession, product_quantities: Dict[int, int], variant_quantities: Dict[int, int]) -> None:
+    await _adjust(db, Product, {row_id: -quantity for row_id, quantity in product_quantities.items()}, "product")
+    await _adjust(db, ProductVariant, {row_id: -quantity for row_id, quantity in variant_quantities.items()}, "variant")
+
+
+async def hold_cart_item(db: AsyncSession, cart_item: CartItem, quantity: int) -> None:
+    """
+    Make the reservation for `cart_item` cover exactly `quantity` units, taking or returning
+    only the difference, and restart its TTL. The cart item must already be flushed.
+    """
+    result = await db.execute(
+        select(StockReservation)
+        .where(StockReservation.cart_item_id == cart_item.id)
+        .with_for_update()
+    )
+    reservation = result.scalar_one_or_none()
+    delta = quantity - (reservation.quantity if reservation else 0)
+
+    if cart_item.variant_id:
+        await _adjust(db, ProductVariant, {cart_item.variant_id: delta}, "variant")
+    else:
+        await _adjust(db, Product, {cart_item.product_id: delta}, "product")
+
+    if quantity <= 0:
+        if reservation:
+            await db.delete(reservation)
+        return
+
+    expires_at = datetime.utcnow() + timedelta(seconds=settings.STOCK_RESERVATION_TTL_SECONDS)
+    if reservation:
+        reservation.quantity = quantity
+        reservation.expires_at = expires_at
+    else:
+        db.add(StockReservation(
+            cart_item_id=cart_item.id,
+            product_id=cart_item.product_id,
+            variant_id=cart_item.variant_id,
+            quantity=quantity,
+            expires_at=expires_at
+        ))
+
+
+async def release_cart_items(db: AsyncSession, cart_item_ids: Iterable[int]) -> list[int]:
+    """Return the units held for these cart items to stock. Returns the affected product ids."""
+    cart_item_ids = list(cart_item_ids)
+    if not cart_item_ids:
+        return []
+    result = await db.execute(
+        delete(StockReservation)
+        .where(StockReservation.cart_item_id.in_(cart_item_ids))
+        .returning(StockReservation.product_id, StockReservation.variant_id, StockReservation.quantity)
+    )
+    rows = result.all()
+    await return_stock(db, *_split(rows))
+    return sorted({row.product_id for row in rows})
+
+
+async def commit_order_stock(
+    db: AsyncSession,
+    product_quantities: Dict[int, int],
+    variant_quantities: Dict[int, int],
+    cart_item_ids: Iterable[int] = ()
+) -> None:
+    """
+    Settle stock for an order: consume the reservations held by `cart_item_ids`, take whatever
+    the order needs beyond them and return any surplus. Runs in the caller's transaction.
+    """
+    held_products, held_variants = {}, {}
+    cart_item_ids = list(cart_item_ids)
+    if cart_item_ids:
+        result = await db.execute(
+            delete(StockReservation)
+            .where(StockReservation.cart_item_id.in_(cart_item_ids))
+            .returning(StockReservation.product_id, StockReservation.variant_id, StockReservation.quantity)
+        )
+        held_products, held_variants = _split(result.all())
+
+    for model, needed, held, label in (
+        (Product, product_quantities, held_products, "product"),
+        (ProductVariant, variant_quantities, held_variants, "variant"),
+    ):
+        deltas = {row_id: needed.get(row_id, 0) - held.get(row_id, 0) for row_id in set(needed) | set(held)}
+        await _adjust(db, model, deltas, label)
+
+
+async def release_expired_reservations(db: AsyncSession, batch_size: int = SWEEP_BATCH_SIZE) -> int:
+    """Return one batch of expired reservations to stock. Safe to run from several workers at once."""
+    try:
+        result = await db.execute(
+            select(StockReservation.id)
+            .where(StockReservation.expires_at <= datetime.utcnow())
+            .order_by(StockReservation.expires_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        expired_ids = result.scalars().all()
+        if not expired_ids:
+            return 0
+
+        result = await db.execute(
+            delete(StockReservation)
+            .where(StockReservation.id.in_(expired_ids))
+            .returning(StockReservation.product_id, StockReservation.variant_id, StockReservation.quantity)
+        )
+        rows = result.all()
+        await return_stock(db, *_split(rows))
+        await db.commit()
+
+    except Exception:
+        await db.rollback()
+        await revert_stock_gate(db)
+        raise
+
+    await apply_stock_gate(db)
+    await invalidate_products(*{row.product_id for row in rows})
+    logger.info(f"Released {len(rows)} expired stock reservations")
+    return len(rows)
+
+
+async def run_reservation_sweeper() -> None:
+    """Background loop started from the app lifespan."""
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                while await release_expired_reservations(db) == SWEEP_BATCH_SIZE:
+                    pass
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Stock reservation sweep failed: {e}")
+        await asyncio.sleep(settings.STOCK_SWEEP_INTERVAL_SECONDS)
@@ -3,8 +3,9 @@ from sqlalchemy import select, update
 from fastapi import HTTPException, status, Request
 from fastapi.responses import JSONResponse
 from app.models.users import User
-from app.schemas.users import UserUpdate
+from app.schemas.users import UserUpdate, UserProfile
 from app.utils.logger import logger
+from app.utils.principal_cache import invalidate_principals, publish_token_version, get_cached_profile, set_cached_profile
 from sqlalchemy.orm import selectinload
 
 
@@ -29,6 +30,45 @@ async def get_user_by_id(db: AsyncSession, user_id: int):
         )
     
 
+def serialize_profile(user: User) -> dict:
+    """UserProfile payload for a User loaded with its seller."""
+    return UserProfile.model_validate(user).model_dump(mode="json")
+
+
+async def get_user_profile(db: AsyncSession, user_id: int) -> dict:
+    """The user's profile from the cache, loading and caching it with a single query on a miss."""
+    profile = await get_cached_profile(user_id)
+    if profile:
+        return profile
+
+    result = await db.execute(select(User).options(selectinload(User.seller)).where(User.id == user_id))
+    user = result.scalar_one_or_none()
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+
+    profile = serialize_profile(user)
+    await set_cached_profile(profile)
+    return profile
+
+
+async def bump_token_version(db: AsyncSession, user_id: int):
+    """
+    Revoke the user's outstanding access tokens as part of the caller's transaction. Pass the
+    returned version to publish_token_version once the transaction has committed.
+    """
+    result = await db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(token_version=User.token_version + 1)
+        .returning(User.token_version)
+        .execution_options(synchronize_session=False)
+    )
+    return result.scalar_one_or_none()
+
+
 async def update_user_details(db: AsyncSession, user_id: int, user_update_data: UserUpdate):
     try:
         result = await db.execute(select(User).options(selectinload(User.seller)).where(User.id == user_id))
@@ -49,6 +89,7 @@ async def update_user_details(db: AsyncSession, user_id: int, user_update_data:
             )
             await db.execute(statement)
             await db.commit()
+            await invalidate_principals(user_id)
         
         await db.refresh(user)
 
@@ -77,8 +118,11 @@ async def delete_user(db: AsyncSession, user_id: int) -> None:
                 detail="User not found"
             )
         
+        revoked_version = (user.token_version or 0) + 1
         await db.delete(user)
         await db.commit()
+        await invalidate_principals(user_id)
+        await publish_token_version(user_id, revoked_version)
 
         logger.info(f"User {user_id} deleted successfully")
     
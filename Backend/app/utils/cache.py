@@ -1,4 +1,73 @@
-import redis
+from typing import Optional
+import redis.asyncio as redis
+from app.core.config import settings
+from app.utils.logger import logger
 
-redis_client = redis.StrictRedis(host='localhost', port=6379, db=0, decode_responses=True)
-redis_client.ping()
+_pool: Optional[redis.BlockingConnectionPool] = None
+_client: Optional[redis.Redis] = None
+
+
+def get_redis() -> redis.Redis:
+    """
+    Return the shared async Redis client, creating it on first use. No connection is opened
+    here; the pool connects lazily, so importing this module never touches the network.
+    """
+    global _pool, _client
+    if _client is not None:
+        return _client
+
+    if settings.REDIS_BACKEND == "fakeredis":
+        # Test mode: an in-process server with the same API, no Redis required.
+        from fakeredis import aioredis as fake_aioredis
+        _client = fake_aioredis.FakeRedis(decode_responses=True)
+        return _client
+
+    # BlockingConnectionPool waits up to REDIS_POOL_TIMEOUT for a free connection instead of
+    # opening an unbounded number of sockets under load.
+    _pool = redis.BlockingConnectionPool.from_url(
+        settings.REDIS_URL,
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+        timeout=settings.REDIS_POOL_TIMEOUT,
+        decode_responses=True
+    )
+    _client = redis.Redis(connection_pool=_pool)
+    return _client
+
+
+def pipeline(transaction: bool = True):
+    """Batch several commands into one round-trip: `async with pipeline() as pipe: ...; await pipe.execute()`."""
+    return get_redis().pipeline(transaction=transaction)
+
+
+async def init_redis() -> None:
+    try:
+        await get_redis().ping()
+        logger.info("Redis connection established.")
+    except Exception as e:
+        logger.warning(f"Redis is not reachable at startup, continuing without it: {e}")
+
+
+async def close_redis() -> None:
+    global _pool, _client
+    if _client is not None:
+        await _client.aclose()
+    if _pool is not None:
+        await _pool.disconnect()
+    _pool = None
+    _client = None
+
+
+def get_pool_metrics() -> dict:
+    if _pool is None:
+        return {"backend": settings.REDIS_BACKEND, "pooled": False}
+
+    in_use = len(getattr(_pool, "_in_use_connections", ()))
+    idle = len(getattr(_pool, "_available_connections", ()))
+    return {
+        "backend": settings.REDIS_BACKEND,
+        "pooled": True,
+        "max_connections": _pool.max_connections,
+        "created_connections": in_use + idle,
+        "in_use_connections": in_use,
+        "idle_connections": idle,
+    }
@@ -1,38 +1,99 @@
 from app.core.cloudinary import cloudinary
-from cloudinary.uploader import upload
+from app.core.config import settings
+from cloudinary.uploader import upload, destroy
+from concurrent.futures import ThreadPoolExecutor
 from fastapi import UploadFile
-from typing import List
+from typing import BinaryIO, List, Optional
+import asyncio
+import os
+import shutil
+import time
+import uuid
 
 
-async def upload_image_to_cloudinary(files: List[UploadFile], folder: str):
-    results = []
-    for file in files:
-        contents = await file.read()
-        if not contents:
-            continue
-        result = upload(
-            contents,
-            folder=folder
-        )
-        results.append({
+class CloudinaryBackend:
+    def upload(self, fileobj: BinaryIO, folder: str) -> dict:
+        result = upload(fileobj, folder=folder)
+        return {
             "secure_url": result["secure_url"],
             "public_id": result["public_id"]
-        })
-    return results
+        }
+
+    def destroy(self, public_id: str) -> dict:
+        return destroy(public_id)
+
+
+class LocalBackend:
+    """Writes uploads under LOCAL_UPLOAD_DIR. Used offline and for benchmarking the pipeline."""
+
+    def __init__(self, root: str, latency_ms: int = 0):
+        self.root = root
+        self.latency = latency_ms / 1000
+
+    def upload(self, fileobj: BinaryIO, folder: str) -> dict:
+        if self.latency:
+            time.sleep(self.latency)
+        public_id = f"{folder}/{uuid.uuid4().hex}"
+        path = os.path.abspath(os.path.join(self.root, public_id))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as out:
+            shutil.copyfileobj(fileobj, out)
+        return {
+            "secure_url": f"file://{path}",
+            "public_id": public_id
+        }
+
+    def destroy(self, public_id: str) -> dict:
+        path = os.path.join(self.root, public_id)
+        if os.path.exists(path):
+            os.remove(path)
+            return {"result": "ok"}
+        return {"result": "not found"}
+
+
+if settings.UPLOAD_BACKEND == "local":
+    upload_backend = LocalBackend(settings.LOCAL_UPLOAD_DIR, settings.LOCAL_UPLOAD_LATENCY_MS)
+else:
+    upload_backend = CloudinaryBackend()
+
+# Uploads are blocking HTTP calls; they run here instead of on the event loop, and the pool
+# size caps how many are in flight across all requests at once.
+upload_executor = ThreadPoolExecutor(max_workers=settings.UPLOAD_CONCURRENCY, thread_name_prefix="upload")
+
+
+def _is_empty(fileobj: BinaryIO) -> bool:
+    fileobj.seek(0, os.SEEK_END)
+    size = fileobj.tell()
+    fileobj.seek(0)
+    return size == 0
+
+
+async def _run_in_upload_pool(func, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(upload_executor, func, *args)
+
+
+async def upload_images(files: List[UploadFile], folder: str) -> List[Optional[dict]]:
+    """
+    Upload all files concurrently, streaming each from its spooled temp file. The result list
+    lines up with `files`; empty files are skipped and yield None in their slot.
+    """
+    async def upload_one(file: UploadFile) -> Optional[dict]:
+        if _is_empty(file.file):
+            return None
+        return await _run_in_upload_pool(upload_backend.upload, file.file, folder)
+
+    return list(await asyncio.gather(*(upload_one(file) for file in files)))
+
+
+async def upload_image_to_cloudinary(files: List[UploadFile], folder: str):
+    results = await upload_images(files, folder)
+    return [result for result in results if result is not None]
 
 async def upload_single_image_to_cloudinary(file: UploadFile, folder: str):
-    contents = await file.read()
-    if not contents:
+    if _is_empty(file.file):
         raise ValueError("File is empty")
-    result = cloudinary.uploader.upload(
-        contents,
-        folder=folder
-    )
-    return {
-        "secure_url": result["secure_url"],
-        "public_id": result["public_id"]
-    }
+    return await _run_in_upload_pool(upload_backend.upload, file.file, folder)
 
 async def delete_image_from_cloudinary(public_id: str):
-    result = cloudinary.uploader.destroy(public_id)
-    return result
\ No newline at end of file
+    return await _run_in_upload_pool(upload_backend.destroy, public_id)
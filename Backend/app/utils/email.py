@@ -1,33 +1,10 @@
-from fastapi_mail import FastMail, MessageSchema
-from app.core.email import conf
-from .otp import generate_otp
-
-async def send_otp_to_email(email: str, purpose: str):
-    try:
-        otp = generate_otp()
-
-        html_content = f"""
-        <div style="font-family: Arial, sans-serif; text-align: center; padding: 20px;">
-            <h2 style="color: #e91e63;">Your OTP Code for {purpose}</h2>
-            <p style="font-size: 16px; color: #333;">Use the following code to proceed:</p>
-            <div style="margin: 20px 0; font-size: 24px; font-weight: bold; color: #000; letter-spacing: 4px;">
-                {otp}
-            </div>
-            <p style="font-size: 14px; color: #666;">This code is valid for 5 minutes. Do not share it with anyone.</p>
-            <hr style="margin: 20px 0; border: none; border-top: 1px solid #ddd;">
-            <p style="font-size: 12px; color: #999;">If you did not request this, please ignore this email.</p>
-        </div>
-        """
-
-        message = MessageSchema(
-            subject=f"Your OTP Code for {purpose}",
-            recipients=[email],
-            body=html_content,
-            subtype="html"
+from fastapi import HTTPException, status
+from app.utils.mail_queue import build_message, mail_queue
+
+def queue_email(recipient: str, subject: str, html: str) -> None:
+    """Hand an HTML email to the mail queue. Raises 503 when the queue is full."""
+    if not mail_queue.enqueue(build_message(recipient, subject, html)):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Email service is busy, please try again shortly."
         )
-
-        fm = FastMail(conf)
-        await fm.send_message(message)
-        return otp
-    except Exception as e:
-        raise e
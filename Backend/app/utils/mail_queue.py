@@ -0,0 +1,183 @@
+import asyncio
+import time
+from email.message import EmailMessage
+from typing import List, Optional
+import aiosmtplib
+from app.core.config import settings
+from app.utils.logger import logger
+from app.utils.metrics import get_histogram, get_histogram_metrics
+
+
+def build_message(recipient: str, subject: str, html: str) -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = settings.MAIL_FROM
+    message["To"] = recipient
+    message["Subject"] = subject
+    message.set_content(html, subtype="html")
+    return message
+
+
+class SMTPTransport:
+    """
+    One SMTP session kept open between sends and reopened after errors or idle timeouts.
+    For local debugging point MAIL_SERVER/MAIL_PORT at a sink such as `python -m aiosmtpd -n`
+    with MAIL_STARTTLS=false and MAIL_USE_CREDENTIALS=false.
+    """
+
+    def __init__(self):
+        self.client: Optional[aiosmtplib.SMTP] = None
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        client = aiosmtplib.SMTP(
+            hostname=settings.MAIL_SERVER,
+            port=settings.MAIL_PORT,
+            start_tls=settings.MAIL_STARTTLS,
+            timeout=settings.MAIL_SEND_TIMEOUT_SECONDS
+        )
+        await client.connect()
+        if settings.MAIL_USE_CREDENTIALS:
+            await client.login(settings.MAIL_USERNAME, settings.MAIL_PASSWORD)
+        return client
+
+    async def send(self, message: EmailMessage) -> None:
+        if self.client is None or not self.client.is_connected:
+            self.client = await self._connect()
+        try:
+            await self.client.send_message(message)
+        except Exception:
+            await self.close()
+            raise
+
+    async def close(self) -> None:
+        client, self.client = self.client, None
+        if client is not None and client.is_connected:
+            try:
+                await client.quit()
+            except Exception:
+                client.close()
+
+
+class MemoryTransport:
+    """Keeps sent messages in `outbox` instead of delivering them. Used in tests and offline runs."""
+
+    outbox: List[EmailMessage] = []
+
+    async def send(self, message: EmailMessage) -> None:
+        self.outbox.append(message)
+
+    async def close(self) -> None:
+        pass
+
+
+def _make_transport():
+    return MemoryTransport() if settings.MAIL_BACKEND == "memory" else SMTPTransport()
+
+
+class MailQueue:
+    """
+    In-process outgoing mail queue. Requests only enqueue; MAIL_WORKERS workers each hold one
+    transport and send up to MAIL_BATCH_SIZE queued messages per wake-up over the same session.
+    Failed messages are retried with exponential backoff up to MAIL_MAX_RETRIES times.
+    """
+
+    def __init__(self):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.MAIL_QUEUE_SIZE)
+        self.workers: List[asyncio.Task] = []
+        self.retrying = 0
+        self.stats = {"enqueued": 0, "sent": 0, "retried": 0, "failed": 0, "rejected": 0}
+
+    def enqueue(self, message: EmailMessage) -> bool:
+        """Queue a message without waiting. Returns False when the queue is full."""
+        try:
+            self.queue.put_nowait((message, 0))
+        except asyncio.QueueFull:
+            self.stats["rejected"] += 1
+            logger.error(f"Mail queue full, dropping message to {message['To']}")
+            return False
+        self.stats["enqueued"] += 1
+        return True
+
+    async def start(self) -> None:
+        if not self.workers:
+            self.workers = [asyncio.create_task(self._work(index)) for index in range(settings.MAIL_WORKERS)]
+
+    async def stop(self, drain_seconds: float = 5.0) -> None:
+        """Give queued mail a moment to go out, then stop the workers."""
+        try:
+            await asyncio.wait_for(self.queue.join(), drain_seconds)
+        except asyncio.TimeoutError:
+            logger.warning(f"Stopping mail queue with {self.queue.qsize()} messages unsent")
+        for worker in self.workers:
+            worker.cancel()
+        for worker in self.workers:
+            try:
+                await worker
+            except asyncio.CancelledError:
+                pass
+        self.workers = []
+
+    async def _next_batch(self) -> list:
+        batch = [await self.queue.get()]
+        while len(batch) < settings.MAIL_BATCH_SIZE:
+            try:
+                batch.append(self.queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return batch
+
+    async def _work(self, index: int) -> None:
+        transport = _make_transport()
+        try:
+            while True:
+                try:
+                    batch = await asyncio.wait_for(self._next_batch(), settings.MAIL_IDLE_TIMEOUT_SECONDS)
+                except asyncio.TimeoutError:
+                    # Let the server-side session go rather than have it time out under us.
+                    await transport.close()
+                    continue
+
+                for message, attempt in batch:
+                    started = time.perf_counter()
+                    try:
+                        await transport.send(message)
+                        get_histogram("mail.send").observe((time.perf_counter() - started) * 1000)
+                        self.stats["sent"] += 1
+                    except Exception as e:
+                        self._retry(message, attempt, e)
+                    finally:
+                        self.queue.task_done()
+        finally:
+            await transport.close()
+
+    def _retry(self, message: EmailMessage, attempt: int, error: Exception) -> None:
+        if attempt >= settings.MAIL_MAX_RETRIES:
+            self.stats["failed"] += 1
+            logger.error(f"Giving up on mail to {message['To']} after {attempt + 1} attempts: {error}")
+            return
+
+        delay = settings.MAIL_RETRY_BASE_SECONDS * 2 ** attempt
+        self.stats["retried"] += 1
+        self.retrying += 1
+        logger.warning(f"Mail to {message['To']} failed ({error}), retrying in {delay}s")
+
+        def requeue():
+            self.retrying -= 1
+            try:
+                self.queue.put_nowait((message, attempt + 1))
+            except asyncio.QueueFull:
+                self.stats["failed"] += 1
+                logger.error(f"Mail queue full, dropping retry to {message['To']}")
+
+        asyncio.get_running_loop().call_later(delay, requeue)
+
+    def get_metrics(self) -> dict:
+        return {
+            **self.stats,
+            "queued": self.queue.qsize(),
+            "retrying": self.retrying,
+            "workers": len(self.workers),
+            **get_histogram_metrics("mail."),
+        }
+
+
+mail_queue = MailQueue()
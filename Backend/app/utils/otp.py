@@ -1,8 +1,7 @@
-import random
+import secrets
 
 def generate_otp(length=6):
     if length <= 0:
         raise ValueError("OTP length must be a positive integer")
     
-    otp = ''.join([str(random.randint(0, 9)) for _ in range(length)])
-    return otp
\ No newline at end of file
+    return f"{secrets.randbelow(10 ** length):0{length}d}"
@@ -0,0 +1,216 @@
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Optional
+from app.core.config import settings
+from app.utils.cache import get_redis, pipeline
+from app.utils.logger import logger
+
+# Bump whenever the Principal fields change so old Redis entries are ignored.
+PRINCIPAL_CACHE_SCHEMA = 3
+
+cache_stats = {"local_hits": 0, "redis_hits": 0, "misses": 0, "profile_hits": 0, "profile_misses": 0, "errors": 0}
+
+# user_id -> (expires_at, Principal), least recently used first.
+_local: "OrderedDict[int, tuple]" = OrderedDict()
+
+
+@dataclass(frozen=True)
+class SellerPrincipal:
+    id: int
+    is_verified: bool
+    is_seller_mode: bool
+
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    The authenticated user as routers see it: what current_user and current_principal return.
+    Carries only the fields used for authorization; services that need the full row load it
+    themselves. Principals built from token claims have no username or email.
+    """
+    id: int
+    is_seller: bool
+    is_admin: bool
+    seller: Optional[SellerPrincipal] = None
+    token_version: int = 0
+    username: Optional[str] = None
+    email: Optional[str] = None
+
+    @classmethod
+    def from_user(cls, user) -> "Principal":
+        seller = user.seller
+        return cls(
+            id=user.id,
+            is_seller=bool(user.is_seller),
+            is_admin=bool(user.is_admin),
+            seller=SellerPrincipal(
+                id=seller.id,
+                is_verified=bool(seller.is_verified),
+                is_seller_mode=bool(seller.is_seller_mode),
+            ) if seller else None,
+            token_version=user.token_version or 0,
+            username=user.username,
+            email=user.email,
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Principal":
+        seller = data.get("seller")
+        return cls(**{**data, "seller": SellerPrincipal(**seller) if seller else None})
+
+    def claims(self) -> dict:
+        """Role claims embedded in access tokens by create_access_token."""
+        return {
+            "ver": self.token_version,
+            "is_seller": self.is_seller,
+            "is_admin": self.is_admin,
+            "seller": asdict(self.seller) if self.seller else None,
+        }
+
+    @classmethod
+    def from_claims(cls, payload: dict) -> "Principal":
+        seller = payload.get("seller")
+        return cls(
+            id=payload["user_id"],
+            is_seller=bool(payload.get("is_seller")),
+            is_admin=bool(payload.get("is_admin")),
+            seller=SellerPrincipal(**seller) if seller else None,
+            token_version=payload["ver"],
+        )
+
+
+def _key(user_id: int) -> str:
+    return f"principal:v{PRINCIPAL_CACHE_SCHEMA}:{user_id}"
+
+
+def _profile_key(user_id: int) -> str:
+    return f"profile:v{PRINCIPAL_CACHE_SCHEMA}:{user_id}"
+
+
+def _token_version_key(user_id: int) -> str:
+    return f"token_version:{user_id}"
+
+
+def _remember(principal: Principal) -> None:
+    _local[principal.id] = (time.monotonic() + settings.PRINCIPAL_CACHE_TTL_SECONDS, principal)
+    _local.move_to_end(principal.id)
+    while len(_local) > settings.PRINCIPAL_CACHE_SIZE:
+        _local.popitem(last=False)
+
+
+async def get_cached_principal(user_id: int) -> Optional[Principal]:
+    """Look in this worker's LRU first, then in Redis when PRINCIPAL_CACHE_REDIS is on."""
+    entry = _local.get(user_id)
+    if entry is not None:
+        expires_at, principal = entry
+        if expires_at > time.monotonic():
+            _local.move_to_end(user_id)
+            cache_stats["local_hits"] += 1
+            return principal
+        del _local[user_id]
+
+    if settings.PRINCIPAL_CACHE_REDIS:
+        try:
+            data = await get_redis().get(_key(user_id))
+            if data:
+                principal = Principal.from_dict(json.loads(data))
+                _remember(principal)
+                cache_stats["redis_hits"] += 1
+                return principal
+        except Exception as e:
+            cache_stats["errors"] += 1
+            logger.warning(f"Principal cache read failed for user_id {user_id}: {e}")
+
+    cache_stats["misses"] += 1
+    return None
+
+
+async def set_cached_principal(principal: Principal) -> None:
+    _remember(principal)
+    if not settings.PRINCIPAL_CACHE_REDIS:
+        return
+    try:
+        await get_redis().setex(_key(principal.id), settings.PRINCIPAL_CACHE_TTL_SECONDS, json.dumps(asdict(principal)))
+
+    except Exception as e:
+        cache_stats["errors"] += 1
+        logger.warning(f"Principal cache write failed for user_id {principal.id}: {e}")
+
+
+async def get_cached_profile(user_id: int) -> Optional[dict]:
+    """The UserProfile payload cached in Redis, or None. Profiles are not kept in the local LRU."""
+    try:
+        data = await get_redis().get(_profile_key(user_id))
+        if data:
+            cache_stats["profile_hits"] += 1
+            return json.loads(data)
+    except Exception as e:
+        cache_stats["errors"] += 1
+        logger.warning(f"Profile cache read failed for user_id {user_id}: {e}")
+    cache_stats["profile_misses"] += 1
+    return None
+
+
+async def set_cached_profile(profile: dict) -> None:
+    try:
+        await get_redis().setex(_profile_key(profile["id"]), settings.PROFILE_CACHE_TTL_SECONDS, json.dumps(profile, default=str))
+
+    except Exception as e:
+        cache_stats["errors"] += 1
+        logger.warning(f"Profile cache write failed for user_id {profile['id']}: {e}")
+
+
+async def invalidate_principals(*user_ids: int) -> None:
+    """
+    Drop cached principals and profiles after a change to the user or their seller row. Other
+    workers' local entries are only bounded by PRINCIPAL_CACHE_TTL_SECONDS, so keep that short.
+    """
+    user_ids = {user_id for user_id in user_ids if user_id is not None}
+    if not user_ids:
+        return
+    for user_id in user_ids:
+        _local.pop(user_id, None)
+    try:
+        async with pipeline() as pipe:
+            for user_id in user_ids:
+                pipe.delete(_key(user_id), _profile_key(user_id))
+            await pipe.execute()
+
+    except Exception as e:
+        cache_stats["errors"] += 1
+        logger.warning(f"Principal cache invalidation failed for user_ids {sorted(user_ids)}: {e}")
+
+
+async def get_token_version(user_id: int) -> Optional[int]:
+    """
+    The user's current token version if it was bumped within the last access-token lifetime,
+    else None. Raises when Redis is unreachable so callers can fall back to the database.
+    """
+    version = await get_redis().get(_token_version_key(user_id))
+    return int(version) if version is not None else None
+
+
+async def publish_token_version(user_id: int, version: int) -> None:
+    """
+    Call after committing a token_version bump. Tokens minted before it are rejected by
+    current_principal; the key outlives every access token that could still carry an old version.
+    """
+    try:
+        await get_redis().setex(_token_version_key(user_id), settings.JWT_EXPIRATION_MINUTES * 60, version)
+        logger.info(f"Published token version {version} for user_id {user_id}")
+
+    except Exception as e:
+        cache_stats["errors"] += 1
+        logger.error(f"Failed to publish token version {version} for user_id {user_id}: {e}")
+
+
+def get_principal_cache_stats() -> dict:
+    lookups = cache_stats["local_hits"] + cache_stats["redis_hits"] + cache_stats["misses"]
+    hits = cache_stats["local_hits"] + cache_stats["redis_hits"]
+    return {
+        **cache_stats,
+        "size": len(_local),
+        "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+    }
@@ -0,0 +1,129 @@
+import json
+from typing import Optional, Tuple
+from app.utils.cache import get_redis, pipeline
+from app.utils.logger import logger
+
+# Bump whenever the shape returned by serialize_product changes so old entries are ignored.
+PRODUCT_CACHE_SCHEMA = 1
+PRODUCT_CACHE_TTL_SECONDS = 600
+
+cache_stats = {"hits": 0, "misses": 0, "errors": 0}
+
+
+def _data_key(product_id: int) -> str:
+    return f"product:v{PRODUCT_CACHE_SCHEMA}:{product_id}"
+
+
+def _version_key(product_id: int) -> str:
+    return f"product:v{PRODUCT_CACHE_SCHEMA}:{product_id}:version"
+
+
+def serialize_product(product) -> dict:
+    """Build the cached product detail payload from a Product with its relationships loaded."""
+    variants = [
+        {
+            "id": variant.id,
+            "product_id": variant.product_id,
+            "variant_name": variant.variant_name,
+            "stock": variant.stock,
+            "price": variant.price,
+            "image_url": variant.image_url,
+        }
+        for variant in product.variants
+    ] if product.has_variants else []
+
+    seller = product.seller
+    category = product.category
+
+    return {
+        "product": {
+            "id": product.id,
+            "product_name": product.product_name,
+            "description": product.description,
+            "base_price": product.base_price,
+            "stock": product.stock,
+            "has_variants": product.has_variants,
+            "category_id": product.category_id,
+            "seller_id": product.seller_id,
+            "created_at": product.created_at,
+            "variants": variants,
+            "images": [
+                {"id": image.id, "product_id": image.product_id, "image_url": image.image_url}
+                for image in product.images
+            ],
+            "category": {
+                "id": category.id,
+                "category_name": category.category_name,
+            } if category else None,
+            "seller": {
+                "id": seller.id,
+                "business_name": seller.business_name,
+                "business_address": seller.business_address,
+                "display_name": seller.display_name,
+                "is_verified": seller.is_verified,
+                "followers": seller.followers,
+                "ratings": seller.ratings,
+            } if seller else None,
+        },
+        "variants": variants,
+    }
+
+
+async def get_cached_product(product_id: int) -> Tuple[Optional[dict], Optional[int]]:
+    """
+    Return (payload, version). The payload is None on a miss; the version must be passed
+    back to set_cached_product so a fill that raced with an invalidation is never served.
+    """
+    try:
+        data, version = await get_redis().mget(_data_key(product_id), _version_key(product_id))
+        version = int(version or 0)
+        if data:
+            entry = json.loads(data)
+            if entry.get("version") == version:
+                cache_stats["hits"] += 1
+                return entry["payload"], version
+        cache_stats["misses"] += 1
+        return None, version
+
+    except Exception as e:
+        cache_stats["errors"] += 1
+        logger.warning(f"Product cache read failed for product_id {product_id}: {e}")
+        return None, None
+
+
+async def set_cached_product(product_id: int, version: Optional[int], payload: dict) -> None:
+    if version is None:
+        return
+    try:
+        entry = json.dumps({"version": version, "payload": payload}, default=str)
+        await get_redis().setex(_data_key(product_id), PRODUCT_CACHE_TTL_SECONDS, entry)
+
+    except Exception as e:
+        cache_stats["errors"] += 1
+        logger.warning(f"Product cache write failed for product_id {product_id}: {e}")
+
+
+async def invalidate_products(*product_ids: int) -> None:
+    """Bump the version of each product so cached and in-flight entries become stale."""
+    product_ids = {product_id for product_id in product_ids if product_id is not None}
+    if not product_ids:
+        return
+    try:
+        async with pipeline() as pipe:
+            for product_id in product_ids:
+                pipe.incr(_version_key(product_id))
+                pipe.delete(_data_key(product_id))
+            await pipe.execute()
+        logger.info(f"Invalidated product cache for product_ids {sorted(product_ids)}")
+
+    except Exception as e:
+        cache_stats["errors"] += 1
+        logger.warning(f"Product cache invalidation failed for product_ids {sorted(product_ids)}: {e}")
+
+
+def get_product_cache_stats() -> dict:
+    lookups = cache_stats["hits"] + cache_stats["misses"]
+    return {
+        **cache_stats,
+        "hit_ratio": round(cache_stats["hits"] / lookups, 4) if lookups else 0.0,
+    }
@@ -0,0 +1,41 @@
+"""
+Load scenarios for the API.
+
+    locust -f locustfile.py --host http://127.0.0.1:8000
+
+Environment:
+    LOCUST_EMAIL, LOCUST_PASSWORD  an existing buyer account
+    LOCUST_PRODUCT_IDS             comma separated product ids to check out, e.g. "1,2,3"
+    LOCUST_ITEMS_PER_ORDER         line items per checkout (default 3)
+
+The checkout route is limited to 30/minute per client IP, so raise the limit or spread
+the users over several source addresses before reading throughput numbers. Run the same
+scenario against the old and new build and compare requests/s and p95 for /orders/checkout.
+"""
+import os
+import random
+from locust import HttpUser, task, between
+
+PRODUCT_IDS = [int(product_id) for product_id in os.getenv("LOCUST_PRODUCT_IDS", "1").split(",")]
+ITEMS_PER_ORDER = int(os.getenv("LOCUST_ITEMS_PER_ORDER", "3"))
+
+
+class CheckoutUser(HttpUser):
+    wait_time = between(0.1, 0.5)
+
+    def on_start(self):
+        response = self.client.post("/v1/api/auth/login", json={
+            "email": os.getenv("LOCUST_EMAIL"),
+            "password": os.getenv("LOCUST_PASSWORD"),
+        })
+        response.raise_for_status()
+        self.client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+
+    @task
+    def checkout(self):
+        product_ids = random.sample(PRODUCT_IDS, min(ITEMS_PER_ORDER, len(PRODUCT_IDS)))
+        self.client.post("/v1/api/orders/checkout", name="/orders/checkout", json={
+            "shipping_address": "Load test address",
+            "payment_method": "COD",
+            "items": [{"product_id": product_id, "quantity": 1} for product_id in product_ids],
+        })
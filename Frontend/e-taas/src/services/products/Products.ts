@@ -4,7 +4,7 @@ import { productApi } from "../axios/ApiServices";
 export const getAllProducts = async () => {
   try {
     const res = await productApi.get("/");
-    return res.data;
+    return res.data.items;
   } catch (error) {
     console.error("Fetching products failed:", error);
     throw error;